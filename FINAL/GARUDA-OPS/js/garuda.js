@@ -753,6 +753,92 @@ function drawMap(){
     }
   });
   gx.textAlign='left';
+  drawBackendTrack();
+}
+
+// ═══════════════════════════════════════════════════════════
+// BACKEND TELEMETRY (Server-Sent Events from python/stream_server.py)
+// The Python planner streams its plan, every flown step and each D* Lite
+// replan; we only render what it sends — no planning in the browser.
+// ═══════════════════════════════════════════════════════════
+const TELEMETRY_URL='http://localhost:5001/mission/stream?paths=compact';
+let telemetry=null, backendPlan=[], backendTrail=[], backendPos=null;
+
+// Paths arrive either as [[r,c],...] or as {encoding:'rle1', data:base64}
+// from python/path_codec.py: varint length, zigzag start, then run-length
+// move tokens (code<<4 | run, run 0 = varint follows, 0xF0 = jump).
+const PATH_MOVES=[[0,0],[-1,0],[1,0],[0,-1],[0,1],[-1,-1],[-1,1],[1,-1],[1,1]];
+function decodePath(p){
+  if(Array.isArray(p)) return p;
+  if(!p||p.encoding!=='rle1') throw new Error('Unknown path encoding: '+(p&&p.encoding));
+  const bin=atob(p.data), bytes=new Uint8Array(bin.length);
+  for(let k=0;k<bin.length;k++) bytes[k]=bin.charCodeAt(k);
+  let i=0;
+  const varint=()=>{ let n=0,mul=1,b; do{ b=bytes[i++]; n+=(b&0x7F)*mul; mul*=128; }while(b&0x80); return n; };
+  const signed=()=>{ const n=varint(); return n%2 ? -(n+1)/2 : n/2; };
+  const n=varint(); if(!n) return [];
+  let r=signed(), c=signed();
+  const path=[[r,c]];
+  while(path.length<n){
+    const tok=bytes[i++], code=tok>>4;
+    if(code===0xF){ r+=signed(); c+=signed(); path.push([r,c]); continue; }
+    const run=(tok&0x0F)||varint(), [dr,dc]=PATH_MOVES[code];
+    for(let k=0;k<run;k++){ r+=dr; c+=dc; path.push([r,c]); }
+  }
+  return path;
+}
+
+function connectTelemetry(url=TELEMETRY_URL){
+  if(telemetry) telemetry.close();
+  if(running){clearInterval(simTimer);running=false;}
+  initMission(); drones=[];
+  backendPlan=[]; backendTrail=[]; backendPos=null;
+  telemetry=new EventSource(url);
+  const on=(type,fn)=>telemetry.addEventListener(type,e=>{ fn(JSON.parse(e.data)); drawMap(); });
+
+  on('start',d=>log(d.stage==='plan'
+    ?`📡 Backend planning: ${d.waypoints} waypoints, battery ${d.battery}`
+    :`📡 Backend flight: ${d.planned_steps} planned steps`,'inf'));
+  on('leg',d=>{ const path=decodePath(d.path); backendPlan.push(...path); path.forEach(([r,c])=>revealFog(r,c)); });
+  on('return_home',d=>{ const path=decodePath(d.path); backendPlan.push(...path); path.forEach(([r,c])=>revealFog(r,c));
+    log(`🏠 Backend: returning home (${d.cost.toFixed(1)} battery)`,'inf'); });
+  on('step',d=>{
+    const [r,c]=d.position;
+    backendPos=d.position; backendTrail.push(d.position);
+    if(liveGrid[r][c]===FREE) liveGrid[r][c]=VISITED;
+    revealFog(r,c);
+  });
+  on('replan',d=>{
+    const [r,c]=d.obstacle;
+    liveGrid[r][c]=OBS; totalReplan++;
+    backendPlan=decodePath(d.new_path);
+    log(`🔄 Backend replanned at step ${d.step} around (${r},${c}) → ${d.new_path_length} cells`,'w');
+  });
+  on('replan_failed',d=>log(`❌ Backend: no path around (${d.obstacle})`,'al'));
+  on('battery_critical',d=>log(`🔋 Backend plan stopped at (${d.position}) — battery ${d.battery.toFixed(1)}`,'w'));
+  on('battery_depleted',d=>log(`🔋 Backend battery depleted at step ${d.step}`,'al'));
+  on('done',d=>{
+    if(d.stage==='plan') return log(`✅ Backend plan: ${d.steps} steps, energy ${d.total_energy.toFixed(1)}`,'ok');
+    log(`✅ Backend mission: ${d.steps} steps | ${d.replannings} replans | ${d.coverage}% coverage`,'ok');
+    telemetry.close(); telemetry=null;
+  });
+  telemetry.onerror=()=>{
+    log('Backend telemetry unavailable — is stream_server.py running?','al');
+    telemetry.close(); telemetry=null;
+  };
+}
+
+function drawBackendTrack(){
+  const line=(pts)=>{
+    gx.beginPath(); gx.moveTo(pts[0][1]*CELL+CELL/2, pts[0][0]*CELL+CELL/2);
+    pts.forEach(p=>gx.lineTo(p[1]*CELL+CELL/2, p[0]*CELL+CELL/2)); gx.stroke();
+  };
+  if(backendPlan.length>1){
+    gx.setLineDash([2,4]); gx.strokeStyle='rgba(0,212,255,.25)'; gx.lineWidth=1;
+    line(backendPlan); gx.setLineDash([]);
+  }
+  if(backendTrail.length>1){ gx.strokeStyle=DRONE_COLORS[0]+'88'; gx.lineWidth=1.4; line(backendTrail); }
+  if(backendPos) drawDrone3D(backendPos[1]*CELL+CELL/2, backendPos[0]*CELL+CELL/2, DRONE_COLORS[0], CELL, 0, 0, 'ACTIVE');
 }
 
 // ═══════════════════════════════════════════════════════════
@@ -0,0 +1,105 @@
+"""
+cells.py - Compact Cell Containers
+CellPath (flat indices in an array('i')) and CellSet (a bitmap) stand in
+for the list / set of (row, col) tuples a drone builds up while flying.
+Used by grid.py (the RL agent) and by the root app's Drone.
+"""
+
+from array import array
+
+import numpy as np
+
+
+class CellPath:
+    """
+    Growing path of (row, col) cells kept as flat indices in an array('i')
+    — 4 bytes a step instead of a tuple. Indexing, slicing, iteration,
+    len() and np.asarray() read it back like the list of tuples it replaces.
+    """
+    __slots__ = ("cols", "cells")
+
+    def __init__(self, shape, cells=()):
+        self.cols = shape[1]
+        self.cells = array('i')
+        for cell in cells:
+            self.append(cell)
+
+    def append(self, cell):
+        self.cells.append(cell[0]*self.cols + cell[1])
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [divmod(v, self.cols) for v in self.cells[i]]
+        return divmod(self.cells[i], self.cols)
+
+    def __iter__(self):
+        cols = self.cols
+        for v in self.cells:
+            yield divmod(v, cols)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"CellPath({list(self)})"
+
+    def flat(self):
+        """The path as a NumPy array of flat cell indices (a copy)"""
+        return np.frombuffer(self.cells, dtype=np.intc).copy()
+
+    def __array__(self, dtype=None, copy=None):
+        return np.stack(np.divmod(self.flat(), self.cols), axis=1).astype(dtype or int, copy=False)
+
+
+class CellSet:
+    """
+    Set of (row, col) cells as a bitmap over a rows x cols grid (one bit a
+    cell) with a running count: add(), `in`, len() and row-major iteration.
+    """
+    __slots__ = ("rows", "cols", "bits", "count")
+
+    def __init__(self, shape, cells=()):
+        self.rows, self.cols = shape
+        self.bits = bytearray((self.rows*self.cols + 7) // 8)
+        self.count = 0
+        for cell in cells:
+            self.add(cell)
+
+    def add(self, cell):
+        r, c = cell
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(f"cell {cell} is off the {self.rows}x{self.cols} grid")
+        self.add_index(r*self.cols + c)
+
+    def add_index(self, i):
+        """add() by flat index (unchecked); True if the cell was not in the set yet"""
+        if self.bits[i >> 3] >> (i & 7) & 1:
+            return False
+        self.bits[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+        return True
+
+    def __contains__(self, cell):
+        r, c = cell
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return False
+        i = r*self.cols + c
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def __len__(self):
+        return self.count
+
+    def mask(self):
+        """The set as a (rows, cols) bool array"""
+        bits = np.unpackbits(np.frombuffer(bytes(self.bits), dtype=np.uint8), bitorder="little")
+        return bits[:self.rows*self.cols].astype(bool).reshape(self.rows, self.cols)
+
+    def __iter__(self):
+        for i in np.flatnonzero(self.mask()).tolist():
+            yield divmod(i, self.cols)
+
+    def __repr__(self):
+        return f"CellSet({set(self)})"
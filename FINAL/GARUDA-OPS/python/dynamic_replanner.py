@@ -6,7 +6,9 @@ without recomputing the entire path from scratch.
 
 import heapq
 import math
+from collections import defaultdict
 from grid import Grid, FREE, OBSTACLE, NO_FLY, VISITED
+from search_stats import SearchStats
 
 INF = float('inf')
 
@@ -17,28 +19,44 @@ class DStarLite:
     an obstacle is discovered — only updates affected nodes.
     """
 
-    def __init__(self, grid: Grid, start, goal):
+    def __init__(self, grid: Grid, start, goal, verbose=True, index=None, stats=None):
+        """
+        index: optional map_index.MapIndex, used to seed the grid's
+        connectivity labels. If start and goal lie in different components
+        the search is skipped entirely
+        stats: optional search_stats.SearchStats; every compute_shortest_path()
+        call is recorded in it as one query
+        """
         self.grid = grid
+        self.verbose = verbose
+        self.stats = stats
         self.start = start
         self.goal = goal
         self.k_m = 0  # Key modifier for accumulated heuristic shifts
 
-        self.g = {}      # Cost from node to goal
-        self.rhs = {}    # One-step lookahead cost
+        # Nodes start at INF and are only stored once touched, instead of
+        # initialising every cell of the grid per replanning event
+        self.g = defaultdict(lambda: INF)     # Cost from node to goal
+        self.rhs = defaultdict(lambda: INF)   # One-step lookahead cost
 
         self.open_set = []
         self._counter = 0  # Tiebreaker for heap
 
-        self._init_all_nodes()
+        self.connectivity = grid.connectivity(index)
+        self.unreachable = self._disconnected()
         self.rhs[self.goal] = 0
         key = self._calc_key(self.goal)
         heapq.heappush(self.open_set, (*key, self.goal))
+        if stats is not None:
+            stats.pushes += 1
 
-    def _init_all_nodes(self):
-        for r in range(self.grid.rows):
-            for c in range(self.grid.cols):
-                self.g[(r,c)]   = INF
-                self.rhs[(r,c)] = INF
+    def _disconnected(self):
+        """O(1) check that start cannot reach goal (the search would flood its whole component)"""
+        labels = self.connectivity.labels
+        goal = labels[self.goal]
+        # A blocked start may still be left through any free neighbour
+        exits = [self.start] if labels[self.start] >= 0 else self._neighbors(self.start)
+        return goal < 0 or all(labels[cell] != goal for cell in exits)
 
     def _heuristic(self, a, b):
         return abs(a[0]-b[0]) + abs(a[1]-b[1])
@@ -82,8 +100,15 @@ class DStarLite:
             key = self._calc_key(node)
             self._counter += 1
             heapq.heappush(self.open_set, (*key, node))
+            if self.stats is not None:
+                self.stats.pushes += 1
 
     def compute_shortest_path(self):
+        if self.unreachable:
+            return
+        stats = self.stats
+        if stats is not None:
+            stats.start()
         while self.open_set:
             k_old = self.open_set[0][:2]
             k_start = self._calc_key(self.start)
@@ -91,12 +116,30 @@ class DStarLite:
             if k_old >= k_start and self.rhs[self.start] == self.g[self.start]:
                 break
 
+            if stats is not None:
+                stats.pops += 1
+                stats.max_open = max(stats.max_open, len(self.open_set))
             node = heapq.heappop(self.open_set)[2]
+            # _update_vertex() pushes a fresh entry instead of updating the
+            # old one (lazy deletion), so a node may still be queued after it
+            # became consistent. Such an entry is stale: expanding it would
+            # take g == rhs for underconsistent, reset g to INF and requeue
+            # the node, and on most maps the search then never ends.
+            if self.g[node] == self.rhs[node]:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue
             k_new = self._calc_key(node)
 
             if k_old < k_new:
+                if stats is not None:
+                    stats.stale_pops += 1
+                    stats.pushes += 1
                 heapq.heappush(self.open_set, (*k_new, node))
-            elif self.g[node] > self.rhs[node]:
+                continue
+            if stats is not None:
+                stats.expanded += 1
+            if self.g[node] > self.rhs[node]:
                 self.g[node] = self.rhs[node]
                 for nb in self._neighbors(node):
                     self._update_vertex(nb)
@@ -105,9 +148,13 @@ class DStarLite:
                 self._update_vertex(node)
                 for nb in self._neighbors(node):
                     self._update_vertex(nb)
+        if stats is not None:
+            stats.stop()
 
     def extract_path(self):
         """Extract best path from start to goal"""
+        if self.unreachable:
+            return []
         path = [self.start]
         current = self.start
         visited = set()
@@ -138,9 +185,11 @@ class DStarLite:
         Called when a new obstacle is discovered mid-flight.
         Updates affected nodes and replans — much faster than full A*.
         """
-        print(f"\n⚠️  NEW OBSTACLE DETECTED at {obstacle_pos}!")
+        if self.verbose:
+            print(f"\n⚠️  NEW OBSTACLE DETECTED at {obstacle_pos}!")
         r, c = obstacle_pos
-        self.grid.grid[r][c] = OBSTACLE
+        self.grid.block_cell(r, c)
+        self.unreachable = self.unreachable or self._disconnected()
 
         self.k_m += self._heuristic(self.start, obstacle_pos)
 
@@ -150,7 +199,8 @@ class DStarLite:
 
         self._update_vertex(obstacle_pos)
         self.compute_shortest_path()
-        print(f"   ✅ Path replanned from current position {self.start}")
+        if self.verbose:
+            print(f"   ✅ Path replanned from current position {self.start}")
 
     def update_start(self, new_start):
         """Move the start position as drone moves"""
@@ -168,12 +218,20 @@ class DynamicMission:
     """
 
     def __init__(self, grid: Grid, planned_path: list, battery: float, 
-                 dynamic_obstacle_schedule: dict = None):
+                 dynamic_obstacle_schedule: dict = None, verbose: bool = True, index=None,
+                 instrument: bool = False):
         """
         dynamic_obstacle_schedule: {step_number: (row, col)} 
         — simulates discovering obstacles at specific steps
+        verbose=False runs headless (no stdout)
+        index: optional map_index.MapIndex of the map before any discoveries
+        instrument=True records D* Lite search counters per replanning event
+        (event["search"]) and in total (self.search_stats)
         """
         self.grid = grid
+        self.verbose = verbose
+        self.index = index
+        self.search_stats = SearchStats() if instrument else None
         self.planned_path = planned_path
         self.battery = battery
         self.dynamic_obstacle_schedule = dynamic_obstacle_schedule or {}
@@ -181,16 +239,33 @@ class DynamicMission:
         self.replanning_events = []
 
     def run(self):
-        print("\n🚁 STARTING DYNAMIC MISSION")
-        print("=" * 50)
+        for _ in self.iter_run():
+            pass
+        return self.executed_path, self.replanning_events
+
+    def iter_run(self):
+        """
+        run() as a generator: yields a telemetry event (dict) for every
+        executed step and replanning as it happens, then a "done" event.
+        """
+        if self.verbose:
+            print("\n🚁 STARTING DYNAMIC MISSION")
+            print("=" * 50)
 
         i = 0
         current_path = list(self.planned_path)
+        free_total = sum(1 for r in range(self.grid.rows) for c in range(self.grid.cols)
+                         if self.grid.is_free(r, c))
+        covered = set()
+        yield {"type": "start", "planned_steps": len(current_path), "battery": self.battery}
 
         while i < len(current_path):
             pos = current_path[i]
             self.executed_path.append(pos)
             self.battery -= 1.0
+            covered.add(pos)
+            yield {"type": "step", "step": i, "position": pos, "battery": self.battery,
+                   "coverage": round(len(covered) / free_total * 100, 2) if free_total else 0}
 
             # Check if a dynamic obstacle appears at this step
             if i in self.dynamic_obstacle_schedule:
@@ -198,34 +273,53 @@ class DynamicMission:
 
                 # Only trigger if the obstacle is ahead in our path
                 if obs_pos in current_path[i:]:
-                    replanner = DStarLite(self.grid, pos, current_path[-1])
+                    stats = SearchStats() if self.search_stats is not None else None
+                    replanner = DStarLite(self.grid, pos, current_path[-1], verbose=self.verbose,
+                                          index=self.index, stats=stats)
                     replanner.compute_shortest_path()
                     replanner.notify_obstacle(obs_pos)
 
                     new_path = replanner.extract_path()
+                    if stats is not None:
+                        self.search_stats.merge(stats)
                     if new_path:
                         current_path = self.executed_path + new_path[1:]
-                        self.replanning_events.append({
+                        event = {
                             "step": i,
                             "position": pos,
                             "obstacle": obs_pos,
                             "new_path_length": len(new_path)
-                        })
+                        }
+                        if stats is not None:
+                            event["search"] = stats.as_dict()
+                        self.replanning_events.append(event)
+                        yield {"type": "replan", **event, "new_path": new_path}
                     else:
-                        print(f"   ❌ No alternate path found! Mission continues on original route.")
+                        if self.verbose:
+                            print(f"   ❌ No alternate path found! Mission continues on original route.")
+                        yield {"type": "replan_failed", "step": i, "position": pos, "obstacle": obs_pos}
 
             if self.battery <= 0:
-                print(f"🔋 Battery depleted at step {i}")
+                if self.verbose:
+                    print(f"🔋 Battery depleted at step {i}")
+                yield {"type": "battery_depleted", "step": i, "position": pos}
                 break
 
             i += 1
 
-        print(f"\n✅ Mission complete!")
-        print(f"   Steps executed    : {len(self.executed_path)}")
-        print(f"   Replanning events : {len(self.replanning_events)}")
-        print(f"   Battery remaining : {self.battery:.1f}")
-
-        for event in self.replanning_events:
-            print(f"   🔄 Replanned at step {event['step']} | pos {event['position']} | obstacle {event['obstacle']}")
-
-        return self.executed_path, self.replanning_events
+        if self.verbose:
+            print(f"\n✅ Mission complete!")
+            print(f"   Steps executed    : {len(self.executed_path)}")
+            print(f"   Replanning events : {len(self.replanning_events)}")
+            print(f"   Battery remaining : {self.battery:.1f}")
+
+            for event in self.replanning_events:
+                print(f"   🔄 Replanned at step {event['step']} | pos {event['position']} | obstacle {event['obstacle']}")
+            if self.search_stats is not None:
+                s = self.search_stats
+                print(f"   🔎 D* Lite search  : {s.expanded} expanded, {s.stale_pops} stale pops, "
+                      f"{s.seconds*1000:.1f} ms")
+
+        yield {"type": "done", "steps": len(self.executed_path),
+               "replannings": len(self.replanning_events), "battery": self.battery,
+               "coverage": round(len(covered) / free_total * 100, 2) if free_total else 0}
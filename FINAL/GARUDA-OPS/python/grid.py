@@ -6,6 +6,8 @@ Defines the environment: safe zones, no-fly zones, obstacles
 import numpy as np
 import random
 
+from cells import CellPath, CellSet  # Re-exported: rl_agent imports them from here
+
 # Cell types
 FREE       = 0   # Safe to fly
 OBSTACLE   = 1   # Physical obstacle (building, mountain, tree)
@@ -20,6 +22,8 @@ class Grid:
         self.grid = np.zeros((rows, cols), dtype=int)
         self.start = (0, 0)
         self.dynamic_obstacles = []  # Discovered mid-flight
+        self._connectivity = None    # map_index.Connectivity, built on first use
+        self._watchers = []          # Derived data told of map edits (see watch())
 
     def set_start(self, row, col):
         self.start = (row, col)
@@ -28,12 +32,15 @@ class Grid:
     def add_obstacle(self, row, col):
         if self.grid[row][col] == FREE:
             self.grid[row][col] = OBSTACLE
+            self._blocked(row, col)
 
     def add_no_fly_zone(self, row_start, row_end, col_start, col_end):
         for r in range(row_start, row_end):
             for c in range(col_start, col_end):
                 if self.grid[r][c] == FREE:
                     self.grid[r][c] = NO_FLY
+        for watcher in self._watchers:
+            watcher.rebuild(self)  # Bulk change: recompute from scratch
 
     def is_free(self, row, col):
         if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
@@ -49,9 +56,39 @@ class Grid:
         if self.grid[row][col] == FREE:
             self.grid[row][col] = OBSTACLE
             self.dynamic_obstacles.append((row, col))
+            self._blocked(row, col)
             return True
         return False
 
+    def block_cell(self, row, col):
+        """Mark any cell OBSTACLE, even one already flown over (replanning)"""
+        self.grid[row][col] = OBSTACLE
+        self._blocked(row, col)
+
+    def watch(self, watcher):
+        """
+        Keep derived data current: watcher.block(row, col) runs whenever a
+        cell becomes an obstacle, watcher.rebuild(grid) after bulk edits.
+        """
+        self._watchers.append(watcher)
+        return watcher
+
+    def _blocked(self, row, col):
+        for watcher in self._watchers:
+            watcher.block(row, col)
+
+    def connectivity(self, index=None):
+        """
+        map_index.Connectivity of the free cells, built on first use (from
+        index's labels if it matches this layout) and kept current by the
+        methods above — direct writes to self.grid bypass it.
+        """
+        if self._connectivity is None:
+            from map_index import Connectivity, free_mask
+            labels = index.labels if index is not None and index.matches(self) else None
+            self._connectivity = self.watch(Connectivity(free_mask(self), labels))
+        return self._connectivity
+
     def coverage_percentage(self):
         total_free = np.sum(self.grid == FREE) + np.sum(self.grid == VISITED) + np.sum(self.grid == START)
         visited = np.sum(self.grid == VISITED) + np.sum(self.grid == START)
@@ -90,3 +127,21 @@ def create_sample_map(rows=20, cols=20):
         g.add_obstacle(r, c)
 
     return g
+
+
+def save_map(grid, path):
+    """Writes the cell array (start cell marked START) to a .npy file"""
+    with open(path, "wb") as f:
+        np.save(f, grid.grid)
+
+
+def load_map(path):
+    """Grid from a save_map() file; the start is the START cell, if any"""
+    with open(path, "rb") as f:
+        cells = np.load(f)
+    g = Grid(*cells.shape)
+    g.grid = cells.astype(int)
+    starts = np.argwhere(cells == START)
+    if len(starts):
+        g.start = tuple(int(v) for v in starts[0])
+    return g
@@ -0,0 +1,125 @@
+"""
+line_of_sight.py - Shared Line-of-Sight Geometry
+Which cells a straight segment between two cell centres touches, and the
+line-of-sight pruning loop built on it. NumPy only, so both smoothing.py
+and the root app's astar_module use this one implementation and apply the
+same clearance rule: a segment is clear only if every cell it touches is
+free, corners included (it never squeezes between two diagonal obstacles).
+"""
+
+import numpy as np
+
+EPS = 1e-9     # Nudge off grid lines when reading the cells on either side
+WINDOW = 8     # Candidates line-of-sight tested in the first vectorised batch (doubles after)
+
+
+# ─────────────────────────────────────────
+# SEGMENT GEOMETRY
+# ─────────────────────────────────────────
+def segment_cells(start, ends, cols):
+    """
+    Every cell touched by the straight segments start → ends[i] (cell
+    centre to cell centre; cells met only at a corner count too). start is
+    one cell or one per segment. Returns (segment id, flat cell index)
+    arrays with one entry per (segment, cell) pair, all segments in one batch.
+    """
+    ends = np.asarray(ends).reshape(-1, 2)
+    starts = np.broadcast_to(np.asarray(start).reshape(-1, 2), ends.shape)
+    delta = ends - starts
+    seg_ids, rows, cols_ = [np.arange(len(ends))], [ends[:, 0]], [ends[:, 1]]
+
+    for axis in (0, 1):
+        other = 1 - axis
+        n = np.abs(delta[:, axis])
+        ids = np.repeat(np.arange(len(ends)), n)
+        k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        # Grid line crossed, with cell edges at integer coordinates
+        line = np.minimum(starts[:, axis], ends[:, axis])[ids] + 1 + k
+        t = (line - starts[ids, axis] - 0.5) / delta[ids, axis]
+        across = starts[ids, other] + 0.5 + t * delta[ids, other]
+        for side in (line - 1, line):
+            for nudge in (-EPS, EPS):
+                cross = np.floor(across + nudge).astype(np.int64)
+                seg_ids.append(ids)
+                rows.append(side if axis == 0 else cross)
+                cols_.append(cross if axis == 0 else side)
+
+    seg = np.concatenate(seg_ids)
+    flat = np.concatenate(rows) * cols + np.concatenate(cols_)
+    size = int(flat.max()) + 1
+    key = np.unique(seg * size + flat)  # Drop cells met at several crossings
+    return key // size, key % size
+
+
+def segment_clear(free, start, ends):
+    """True per segment start → ends[i] if every cell it touches is free (2D bool array)"""
+    ends = np.asarray(ends).reshape(-1, 2)
+    seg, flat = segment_cells(start, ends, free.shape[1])
+    return np.bincount(seg, weights=~free.ravel()[flat], minlength=len(ends)) == 0
+
+
+def octile(start, ends, straight=1.0, diagonal=1.4):
+    """Length of start → ends[i] as straight cells plus diagonal cells"""
+    d = np.abs(np.asarray(ends).reshape(-1, 2) - np.asarray(start).reshape(-1, 2))
+    steps = d.min(axis=1)
+    return straight * (d.max(axis=1) - steps) + diagonal * steps
+
+
+def headings(points, prev_direction=None):
+    """
+    (heading, turned) for every segment of a waypoint list: its direction
+    in lowest terms, and whether it differs from the one before
+    """
+    delta = np.diff(np.asarray(points).reshape(-1, 2), axis=0)
+    step = np.gcd(delta[:, 0], delta[:, 1])
+    step[step == 0] = 1
+    heading = delta // step[:, None]
+    before = np.vstack([prev_direction if prev_direction is not None else (0, 0), heading[:-1]])
+    turned = np.any(heading != before, axis=1)
+    if prev_direction is None:
+        turned[0] = False   # First move from rest is not a turn
+    return heading, turned
+
+
+# ─────────────────────────────────────────
+# PRUNING
+# ─────────────────────────────────────────
+def prune(points, spent, segment_costs, turn_extra=None):
+    """
+    Line-of-sight pruning of a cell path: from each kept waypoint, jump to
+    the farthest later corner (change of heading) that is in sight and no
+    dearer to fly straight to than along the path. Returns kept indices.
+
+    spent[i]: energy to reach points[i] along the path.
+    segment_costs(i, cand) -> (clear, cost) arrays for the straight
+    segments points[i] → points[cand].
+    turn_extra[i]: turn charge paid on leaving points[i]; it is paid either
+    way, so it doesn't count as saved by a shortcut.
+    Candidates are tested in vectorised batches (WINDOW, then doubling),
+    stopping at the first one out of sight.
+    """
+    heading, _ = headings(points)
+    # A straight run has no shortcut, so only cells where the heading changes are candidates
+    corners = np.concatenate([[0], np.flatnonzero(np.any(heading[1:] != heading[:-1], axis=1)) + 1,
+                              [len(points) - 1]])
+    keep = [0]
+    a = 0
+    while a < len(corners) - 1:
+        i = corners[a]
+        best = a + 1   # Next corner: the path itself, always allowed
+        budget = spent[i] + (turn_extra[i] if turn_extra is not None else 0.0)
+        lo, window = a + 1, WINDOW
+        while lo < len(corners):
+            cand = corners[lo:lo + window]
+            clear, cost = segment_costs(i, cand)
+            cut = np.flatnonzero(~clear)
+            seen = cut[0] if len(cut) else len(cand)
+            ok = cost[:seen] <= spent[cand[:seen]] - budget + EPS
+            if ok.any():
+                best = lo + np.flatnonzero(ok)[-1]
+            if len(cut):
+                break
+            lo, window = lo + window, window * 2
+        keep.append(int(corners[best]))
+        a = best
+    return keep
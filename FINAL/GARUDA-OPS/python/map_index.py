@@ -0,0 +1,273 @@
+"""
+map_index.py - Precomputed Map Index
+Stage 0: Derives once per map what the planners otherwise recompute at
+runtime (free mask, connected components, proximity field, sweep order)
+and stores it as a versioned sidecar bundle next to the map file.
+
+Run:  python -m map_index export-sample sample_map.npy
+      python -m map_index preprocess sample_map.npy     → sample_map.npy.idx.npz
+"""
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from grid import FREE, START, VISITED, create_sample_map, load_map, save_map
+from planner import proximity_field
+
+INDEX_VERSION = 1
+INDEX_SUFFIX  = ".idx.npz"
+
+
+# ─────────────────────────────────────────
+# DERIVED DATA
+# ─────────────────────────────────────────
+def free_mask(grid):
+    """Cells a drone may fly through (same rule as Grid.is_free)"""
+    return np.isin(grid.grid, (FREE, START, VISITED))
+
+
+def map_hash(free):
+    """Identifies the flyable layout; VISITED marks don't change it"""
+    h = hashlib.sha1(str(free.shape).encode())
+    h.update(np.packbits(free).tobytes())
+    return h.hexdigest()[:16]
+
+
+def label_components(free):
+    """
+    4-connected component labels of the free cells (-1 = blocked).
+    Free cells are grouped into horizontal runs, runs touching vertically
+    are merged by vectorised hooking + pointer jumping, so the Python-level
+    work is a handful of array passes rather than a flood fill per cell.
+    """
+    rows, cols = free.shape
+    edges = np.diff(np.pad(free, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    starts = np.flatnonzero(edges.ravel() == 1)   # Flat index into (rows, cols+1)
+    n = len(starts)
+    if n == 0:
+        return np.full(free.shape, -1, dtype=np.int32)
+
+    # Run id of every cell: count run starts up to and including the cell
+    begin = np.zeros(free.shape, dtype=np.int32)
+    begin[np.divmod(starts, cols + 1)] = 1
+    run_id = np.cumsum(begin.ravel()).reshape(free.shape) - 1
+    run_id[~free] = -1
+
+    # Runs that touch vertically must share a label
+    above, below = run_id[:-1].ravel(), run_id[1:].ravel()
+    touching = (above >= 0) & (below >= 0)
+    a, b = above[touching], below[touching]
+
+    parent = np.arange(n, dtype=np.int32)
+    while True:
+        pa, pb = parent[a], parent[b]
+        differ = pa != pb
+        if not differ.any():
+            break
+        lo, hi = np.minimum(pa, pb)[differ], np.maximum(pa, pb)[differ]
+        np.minimum.at(parent, hi, lo)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    _, component = np.unique(parent, return_inverse=True)
+    labels = np.full(free.shape, -1, dtype=np.int32)
+    labels[free] = component.astype(np.int32)[run_id[free]]
+    return labels
+
+
+def sweep_order(free):
+    """boustrophedon_path() as flat cell indices: even rows →, odd rows ←"""
+    rows, cols = free.shape
+    order = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    order[1::2] = order[1::2, ::-1]
+    order = order.ravel()
+    return order[free.ravel()[order]]
+
+
+# ─────────────────────────────────────────
+# LIVE CONNECTIVITY
+# ─────────────────────────────────────────
+# 8-neighbour ring around a cell, in order: consecutive entries are
+# 4-adjacent to each other and the even entries are the 4-neighbours
+RING = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+
+class Connectivity:
+    """
+    Component labels of one Grid's free cells, kept current as cells get
+    blocked (Grid.connectivity() owns one per grid). reachable() is two
+    array lookups. Blocking a cell relabels only its own component, and
+    only when the cell may be a cut point: if its free 4-neighbours are
+    joined around the 3x3 ring the component cannot split.
+    """
+
+    def __init__(self, free, labels=None):
+        self.labels = label_components(free) if labels is None else np.array(labels, dtype=np.int32)
+        self.rows, self.cols = free.shape
+        self._next_label = int(self.labels.max()) + 1
+
+    def rebuild(self, grid):
+        self.labels = label_components(free_mask(grid))
+        self._next_label = int(self.labels.max()) + 1
+
+    def reachable(self, a, b):
+        la = self.labels[a]
+        return bool(la >= 0 and la == self.labels[b])
+
+    def reachable_from(self, start, cells):
+        """The cells (list of (row, col)) in start's component, order kept"""
+        if not cells:
+            return []
+        at = np.asarray(cells).reshape(-1, 2)
+        label = self.labels[start]
+        keep = (self.labels[at[:, 0], at[:, 1]] == label) & (label >= 0)
+        return [cell for cell, k in zip(cells, keep.tolist()) if k]
+
+    def block(self, row, col):
+        label = self.labels[row, col]
+        if label < 0:
+            return
+        self.labels[row, col] = -1
+
+        ring = [0 <= row + dr < self.rows and 0 <= col + dc < self.cols
+                and self.labels[row + dr, col + dc] == label for dr, dc in RING]
+        # Free 4-neighbours not joined to the previous one around the ring
+        runs = sum(1 for i in range(0, 8, 2) if ring[i] and not (ring[i - 1] and ring[i - 2]))
+        if runs > 1:
+            self._relabel(label)
+
+    def _relabel(self, label):
+        """Split label into its connected pieces; the largest keeps the id"""
+        member = self.labels == label
+        rows = np.flatnonzero(member.any(axis=1))
+        cols = np.flatnonzero(member.any(axis=0))
+        box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        pieces = label_components(member[box])
+        count = int(pieces.max()) + 1
+        if count == 1:
+            return
+        largest = int(np.argmax(np.bincount(pieces[pieces >= 0])))
+        region = self.labels[box]
+        for piece in range(count):
+            if piece != largest:
+                region[pieces == piece] = self._next_label
+                self._next_label += 1
+
+
+# ─────────────────────────────────────────
+# INDEX BUNDLE
+# ─────────────────────────────────────────
+class MapIndex:
+    """
+    Read-only derived data for one map layout:
+      free       bool (rows, cols)   flyable cells
+      labels     int32 (rows, cols)  component id per free cell, -1 blocked
+      proximity  float (rows, cols)  proximity_penalty() of every cell
+      sweep      int32 (n,)          boustrophedon waypoints, flat indices
+      sizes      int32 (k,)          free cells per component
+    """
+
+    def __init__(self, free, labels, proximity, sweep, sizes, layout_hash):
+        self.free = free
+        self.labels = labels
+        self.proximity = proximity
+        self.sweep = sweep
+        self.sizes = sizes
+        self.layout_hash = layout_hash
+        self.rows, self.cols = free.shape
+
+    @classmethod
+    def build(cls, grid):
+        free = free_mask(grid)
+        labels = label_components(free)
+        sizes = np.bincount(labels[free], minlength=labels.max() + 1).astype(np.int32)
+        return cls(free, labels, proximity_field(grid), sweep_order(free), sizes, map_hash(free))
+
+    # ── Queries ──────────────────────────────────────────
+    def matches(self, grid):
+        """True if built from this grid's layout (obstacles and no-fly zones)"""
+        return (grid.rows, grid.cols) == (self.rows, self.cols) and map_hash(free_mask(grid)) == self.layout_hash
+
+    def reachable(self, a, b):
+        """
+        False if a and b lie in different components. Obstacles added after
+        the index was built only split components, so False stays exact.
+        """
+        la, lb = self.labels[a], self.labels[b]
+        return bool(la >= 0 and la == lb)
+
+    def sweep_path(self):
+        """Sweep order as (row, col) tuples, like boustrophedon_path()"""
+        return [divmod(v, self.cols) for v in self.sweep.tolist()]
+
+    # ── Sidecar file ─────────────────────────────────────
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f, version=INDEX_VERSION, layout_hash=self.layout_hash,
+                free=np.packbits(self.free), shape=np.array(self.free.shape),
+                labels=self.labels, proximity=self.proximity, sweep=self.sweep, sizes=self.sizes,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                raise ValueError(f"{path}: index version {int(data['version'])}, "
+                                 f"expected {INDEX_VERSION} — re-run preprocess")
+            rows, cols = data["shape"].tolist()
+            free = np.unpackbits(data["free"], count=rows * cols).reshape(rows, cols).astype(bool)
+            return cls(free, data["labels"], data["proximity"], data["sweep"], data["sizes"],
+                       str(data["layout_hash"]))
+
+
+def sidecar_path(map_path):
+    return map_path + INDEX_SUFFIX
+
+
+def load_for(grid, map_path):
+    """The map's sidecar index if present and current, else None"""
+    try:
+        index = MapIndex.load(sidecar_path(map_path))
+    except (OSError, ValueError):
+        return None
+    return index if index.matches(grid) else None
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Build map sidecar indexes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pre = sub.add_parser("preprocess", help="build <map>" + INDEX_SUFFIX + " for a .npy map")
+    pre.add_argument("map")
+    pre.add_argument("-o", "--out", help="output path (default: next to the map)")
+    sample = sub.add_parser("export-sample", help="write create_sample_map() as a .npy map")
+    sample.add_argument("map")
+    args = parser.parse_args()
+
+    if args.command == "export-sample":
+        save_map(create_sample_map(), args.map)
+        print(f"🗺️  Sample map written to {args.map}")
+        return
+
+    grid = load_map(args.map)
+    t0 = time.perf_counter()
+    index = MapIndex.build(grid)
+    elapsed = time.perf_counter() - t0
+    out = args.out or sidecar_path(args.map)
+    index.save(out)
+    print(f"✅ Indexed {grid.rows}x{grid.cols} map in {elapsed*1000:.1f} ms → {out}")
+    print(f"   Free cells: {int(index.free.sum())} | Components: {len(index.sizes)} "
+          f"| Sweep waypoints: {len(index.sweep)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+mapgen.py - Procedural Map Generator
+Stage 0: Seeded, vectorised generation of large Grids for stress testing —
+building clusters, walls, no-fly rectangles/circles, corridors and mazes
+at controlled densities. Every feature is painted with whole-array NumPy
+operations; a 5000x5000 map takes roughly 0.3-0.6 s on one core (city
+is the slowest style), so budget about a second on slower machines.
+
+Run:  python -m mapgen city_5k.npy --size 5000 --style city --seed 1
+      python -m map_index preprocess city_5k.npy
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from grid import Grid, FREE, OBSTACLE, NO_FLY, START, save_map
+
+STYLES = ("city", "maze", "scatter")
+
+# City layout
+CLUSTER_SIDE     = 100        # Map area per building cluster (CLUSTER_SIDE^2 cells)
+CLUSTER_SPREAD   = 20         # Std-dev of building positions around a cluster centre
+BUILDING_MAX     = 12         # Largest building side (cells)
+WALL_SHARE       = 0.15       # Part of the obstacle density spent on walls
+WALL_GAP         = 3          # Opening left in every wall
+CORRIDOR_SPACING = 40         # Mean distance between corridors
+CORRIDOR_WIDTH   = 2
+NO_FLY_MAX       = 40         # Largest no-fly rectangle side / circle radius
+FILL_ROUNDS      = 6          # Times a shape batch may be doubled to reach a density
+PROBE_POINTS     = 256 * 256  # Lattice cells coverage is measured on
+
+
+# ─────────────────────────────────────────
+# PAINTING PRIMITIVES
+# ─────────────────────────────────────────
+def paint_rects(mask, r0, c0, r1, c1):
+    """
+    OR the half-open rectangles [r0, r1) x [c0, c1) into a bool mask in a
+    single pass: +1/-1 at the corners of each rectangle, then a 2D prefix
+    sum. Cost is O(cells + rectangles), not O(painted area).
+    """
+    rows, cols = mask.shape
+    r0, r1 = np.clip(r0, 0, rows), np.clip(r1, 0, rows)
+    c0, c1 = np.clip(c0, 0, cols), np.clip(c1, 0, cols)
+    keep = (r1 > r0) & (c1 > c0)
+    r0, c0, r1, c1 = r0[keep], c0[keep], r1[keep], c1[keep]
+
+    # int16 halves the prefix-sum traffic; it would only overflow with
+    # 32k shapes stacked on one cell
+    diff = np.zeros((rows + 1, cols + 1), dtype=np.int16)
+    # One flat add.at with explicit weights takes NumPy's fast path
+    corners = np.concatenate([r0 * (cols + 1) + c0, r0 * (cols + 1) + c1,
+                              r1 * (cols + 1) + c0, r1 * (cols + 1) + c1])
+    signs = np.repeat(np.array([1, -1, -1, 1], dtype=np.int16), len(r0))
+    np.add.at(diff.reshape(-1), corners, signs)
+    # Down the rows one whole row at a time: several times faster than
+    # cumsum(axis=0), which walks the array column by column
+    for r in range(1, rows + 1):
+        np.add(diff[r], diff[r - 1], out=diff[r])
+    np.cumsum(diff, axis=1, out=diff)
+    mask |= diff[:rows, :cols] > 0
+
+
+def circle_rows(cr, cc, radius):
+    """Discs as one-row rectangles (r0, c0, r1, c1) for paint_rects()"""
+    radius = np.asarray(radius, dtype=np.int64)
+    spans = 2 * radius + 1
+    owner = np.repeat(np.arange(len(radius)), spans)
+    offset = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    dr = offset - radius[owner]
+    half = np.floor(np.sqrt(radius[owner] ** 2 - dr ** 2)).astype(np.int64)
+    r0 = cr[owner] + dr
+    return r0, cc[owner] - half, r0 + 1, cc[owner] + half + 1
+
+
+def covered_points(probe_rows, probe_cols, r0, c0, r1, c1, stride):
+    """
+    (shape index, flat probe index) for every probe point (multiples of
+    stride) each shape covers, ordered by shape. Work is proportional to
+    the probe points covered, not to the shapes' area.
+    """
+    i0, i1 = -(-r0 // stride), np.minimum(-(-r1 // stride), probe_rows)
+    j0, j1 = -(-c0 // stride), np.minimum(-(-c1 // stride), probe_cols)
+    i0, j0 = np.maximum(i0, 0), np.maximum(j0, 0)
+    ni, nj = np.maximum(i1 - i0, 0), np.maximum(j1 - j0, 0)
+    count = ni * nj
+    owner = np.repeat(np.arange(len(r0)), count)
+    local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    flat = (i0[owner] + local // nj[owner]) * probe_cols + j0[owner] + local % nj[owner]
+    return owner, flat
+
+
+def first_hits(probe_rows, probe_cols, r0, c0, r1, c1, stride):
+    """
+    For every probe point the index of the first shape covering it, or
+    len(r0) if none does.
+    """
+    owner, flat = covered_points(probe_rows, probe_cols, r0, c0, r1, c1, stride)
+    first = np.full(probe_rows * probe_cols, len(r0), dtype=np.int64)
+    np.minimum.at(first, flat, owner)
+    return first
+
+
+def top_up(mask, needed, sample, area, allowed=None):
+    """
+    Set at least `needed` more cells of mask (inside `allowed`) by adding
+    whole shapes from sample(), counted exactly cell by cell. Only the
+    cells the new shapes cover are touched, so this is cheap next to a
+    full paint_rects() pass.
+    """
+    rows, cols = mask.shape
+    owners, flats, drawn = [], [], 0
+    n = max(1, math.ceil(needed / area))
+    for _ in range(FILL_ROUNDS):
+        rects = sample(n)
+        owner, flat = covered_points(rows, cols, *rects, 1)
+        new = ~mask.ravel()[flat]
+        if allowed is not None:
+            new &= allowed.ravel()[flat]
+        owners.append(owner[new] + drawn)
+        flats.append(flat[new])
+        drawn += len(rects[0])
+        # Batches are in shape order, so the first hit on a cell is its first shape
+        cells, at = np.unique(np.concatenate(flats), return_index=True)
+        first = np.concatenate(owners)[at]
+        if len(cells) >= needed:
+            k = np.sort(first)[needed - 1]
+            mask.flat[cells[first <= k]] = True
+            return
+        # Size the next batch on the new cells each shape has found so far
+        n = max(1, math.ceil(1.25 * (needed - len(cells)) * drawn / max(len(cells), 1)))
+    mask.flat[cells] = True   # Target out of reach: keep what was found
+
+
+def fill_to(mask, layers, allowed=None):
+    """
+    Paint shapes into mask (kept inside `allowed`) until each layer's target
+    fraction of all cells is covered. layers: (target, sample, area) in
+    order, sample(n) -> (r0, c0, r1, c1) drawing n shapes of about `area`
+    cells each. Everything is painted at the end in a single pass.
+
+    Coverage is measured on a lattice of about PROBE_POINTS cells: each probe
+    remembers the first shape that covers it, so coverage after the first k
+    shapes is read off directly and the smallest k reaching the target is
+    kept. Clustered shapes overlap far more than the overlap model
+    cover = 1 - exp(-n * area / cells) assumes, so that model only sizes
+    the first batch; more is drawn until the target is reachable. The probe
+    estimate can fall a little short, so after painting top_up() adds
+    shapes until the last layer's target is met exactly (when `allowed`
+    leaves room for it).
+    """
+    stride = max(1, math.isqrt(mask.size // PROBE_POINTS))
+    probe = mask[::stride, ::stride].copy()
+    usable = None if allowed is None else allowed[::stride, ::stride]
+    chosen = []
+    for target, sample, area in layers:
+        open_probe = ~probe if usable is None else usable & ~probe
+        needed = math.ceil(target * probe.size) - np.count_nonzero(probe)
+        if needed <= 0:
+            continue
+
+        share = min(needed / max(np.count_nonzero(open_probe), 1), 0.999)
+        n = max(1, math.ceil(-math.log(1 - share) * mask.size / area))
+        batches = []
+        for _ in range(FILL_ROUNDS):
+            batches.append(sample(n))
+            rects = [np.concatenate(side) for side in zip(*batches)]
+            first = first_hits(*probe.shape, *rects, stride)
+            hits = np.sort(first[open_probe.ravel()])
+            if len(hits) >= needed and hits[needed - 1] < len(rects[0]):
+                k = hits[needed - 1] + 1
+                break
+            n = len(rects[0])  # Double up and try again
+        else:
+            k = len(rects[0])  # Target out of reach (e.g. too little allowed area)
+
+        probe |= open_probe & (first < k).reshape(probe.shape)
+        chosen.append([side[:k] for side in rects])
+
+    if chosen:
+        paint_rects(mask, *(np.concatenate(side) for side in zip(*chosen)))
+        if allowed is not None:
+            mask &= allowed
+
+    # The probes only estimate coverage; make the last target a true floor
+    target, sample, area = layers[-1]
+    needed = math.ceil(target * mask.size) - np.count_nonzero(mask)
+    if needed > 0:
+        top_up(mask, needed, sample, area, allowed)
+
+
+# ─────────────────────────────────────────
+# STYLES
+# ─────────────────────────────────────────
+def city_blocked(rng, rows, cols, density):
+    """Building clusters plus long walls, cut through by a corridor lattice"""
+    side = min(rows, cols)
+    clusters = max(1, round(rows * cols / CLUSTER_SIDE ** 2))
+    centres = rng.random((clusters, 2)) * (rows, cols)
+    spread = max(2.0, min(CLUSTER_SPREAD, side / 5))
+    biggest = max(2, min(BUILDING_MAX, side // 4))
+
+    def buildings(n):
+        at = centres[rng.integers(clusters, size=n)] + rng.normal(0, spread, (n, 2))
+        h, w = rng.integers(2, biggest + 1, size=(2, n))
+        r0, c0 = at[:, 0].astype(np.int64), at[:, 1].astype(np.int64)
+        return r0, c0, r0 + h, c0 + w
+
+    def walls(n):
+        length = rng.integers(max(2, side // 8), max(3, side // 2), size=n)
+        r0, c0 = rng.integers(rows, size=n), rng.integers(cols, size=n)
+        across = rng.random(n) < 0.5
+        h, w = np.where(across, 1, length), np.where(across, length, 1)
+        # Split every wall in two around a WALL_GAP-wide opening
+        cut = rng.integers(0, length)
+        first = (r0, c0, r0 + np.where(across, 1, cut), c0 + np.where(across, cut, 1))
+        skip = cut + WALL_GAP
+        second = (r0 + np.where(across, 0, skip), c0 + np.where(across, skip, 0), r0 + h, c0 + w)
+        return tuple(np.concatenate(pair) for pair in zip(first, second))
+
+    # Corridors: jittered full-length strips that are always kept clear
+    def lattice(n):
+        marks = np.zeros(n, dtype=bool)
+        starts = np.cumsum(rng.integers(CORRIDOR_SPACING // 2, CORRIDOR_SPACING * 3 // 2 + 1,
+                                        size=n // (CORRIDOR_SPACING // 2) + 1))
+        for k in range(CORRIDOR_WIDTH):
+            marks[starts[starts + k < n] + k] = True
+        return marks
+    open_area = ~(lattice(rows)[:, None] | lattice(cols)[None, :])
+    open_area[:3, :3] = open_area[-3:, -3:] = False  # Kept free by generate_map()
+
+    blocked = np.zeros((rows, cols), dtype=bool)
+    wall_area = max(1.0, (side // 8 + side // 2) / 2 - WALL_GAP)
+    fill_to(blocked, [(density * WALL_SHARE, walls, wall_area),
+                      (density, buildings, (biggest + 2) ** 2 / 4)], open_area)
+    return blocked
+
+
+def maze_blocked(rng, rows, cols, density, passage=1):
+    """
+    Binary-tree maze (each cell opens north or west at random, which is a
+    spanning tree, built in one vectorised step) with passage-wide
+    corridors. Remaining walls are opened at random down to `density`;
+    the perfect maze itself is about 50% wall.
+    """
+    step = passage + 1
+    mr, mc = -(-rows // step), -(-cols // step)
+    north = rng.random((mr, mc)) < 0.5
+    north[0, :] = False   # Top row can only open west
+    north[:, 0] = True    # Left column can only open north
+    open_n = north.copy()
+    open_w = ~north
+    open_n[0, 0] = open_w[0, 0] = False
+
+    # Lattice of (passage+1)-cell tiles: the passage square in the corner,
+    # the rest wall unless carved
+    blocked = np.ones((mr, step, mc, step), dtype=bool)
+    blocked[:, 1:, :, 1:] = False
+    blocked[:, 0, :, 1:] &= ~open_n[:, :, None]
+    blocked[:, 1:, :, 0] &= ~open_w[:, None, :]
+    blocked = blocked.reshape(mr * step, mc * step)[1:rows + 1, 1:cols + 1]
+    if blocked.shape != (rows, cols):
+        blocked = np.pad(blocked, ((0, rows - blocked.shape[0]), (0, cols - blocked.shape[1])))
+
+    # Braid: knock out wall cells at random to reach the target density
+    current = np.count_nonzero(blocked) / blocked.size
+    if density < current:
+        blocked &= rng.random((rows, cols), dtype=np.float32) < density / current
+    return blocked
+
+
+def scatter_blocked(rng, rows, cols, density):
+    """Independent random cells (the old benchmark maps)"""
+    return rng.random((rows, cols), dtype=np.float32) < density
+
+
+# ─────────────────────────────────────────
+# GENERATOR
+# ─────────────────────────────────────────
+def generate_map(rows, cols=None, seed=None, style="city", density=0.2, no_fly=0.05,
+                 passage=1):
+    """
+    Seeded procedural Grid. density: fraction of cells that are obstacles
+    (a floor for city, reached exactly unless the corridors leave too
+    little room; the expectation for maze/scatter); no_fly: fraction
+    of cells inside no-fly rectangles and circles, on top of the obstacles.
+    passage: maze corridor width. The 3x3 corners around the start (0,0)
+    and the far corner are always left free.
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unknown map style {style!r} (expected one of {', '.join(STYLES)})")
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+
+    if style == "city":
+        blocked = city_blocked(rng, rows, cols, density)
+    elif style == "maze":
+        blocked = maze_blocked(rng, rows, cols, density, passage)
+    else:
+        blocked = scatter_blocked(rng, rows, cols, density)
+
+    restricted = np.zeros((rows, cols), dtype=bool)
+    if no_fly > 0:
+        biggest = max(2, min(NO_FLY_MAX, min(rows, cols) // 4))
+
+        def zones(n):
+            # Half rectangles, half circles
+            nr = n // 2 + n % 2
+            r0, c0 = rng.integers(rows, size=nr), rng.integers(cols, size=nr)
+            h, w = rng.integers(2, biggest + 1, size=(2, nr))
+            radius = rng.integers(1, biggest // 2 + 1, size=n - nr)
+            disc = circle_rows(rng.integers(rows, size=n - nr), rng.integers(cols, size=n - nr),
+                               radius)
+            return tuple(np.concatenate(pair) for pair in zip((r0, c0, r0 + h, c0 + w), disc))
+        zone_area = ((biggest + 2) ** 2 / 4 + math.pi * (biggest / 4 + 0.5) ** 2) / 2
+        allowed = ~blocked
+        allowed[:3, :3] = allowed[-3:, -3:] = False
+        fill_to(restricted, [(no_fly, zones, zone_area)], allowed)
+
+    cells = blocked.astype(int)
+    cells[restricted] = NO_FLY
+    cells[:3, :3] = FREE
+    cells[-3:, -3:] = FREE
+
+    g = Grid(rows, cols)
+    g.grid = cells
+    g.set_start(0, 0)
+    return g
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a procedural .npy map")
+    parser.add_argument("map", help="output .npy path")
+    parser.add_argument("--size", type=int, nargs="+", default=[1000], help="rows [cols]")
+    parser.add_argument("--style", choices=STYLES, default="city")
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--no-fly", type=float, default=0.05)
+    parser.add_argument("--passage", type=int, default=1, help="maze corridor width")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    grid = generate_map(*args.size[:2], seed=args.seed, style=args.style, density=args.density,
+                        no_fly=args.no_fly, passage=args.passage)
+    elapsed = time.perf_counter() - t0
+    save_map(grid, args.map)
+    cells = grid.rows * grid.cols
+    print(f"🗺️  {args.style} map {grid.rows}x{grid.cols} generated in {elapsed*1000:.1f} ms → {args.map}")
+    print(f"   Obstacles: {(grid.grid == OBSTACLE).sum() / cells:.1%} | "
+          f"No-fly: {(grid.grid == NO_FLY).sum() / cells:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+path_codec.py - Compact Path Encoding
+Packs (row, col) paths into run-length encoded move codes so long mission
+paths travel as kilobytes of base64 instead of megabytes of JSON arrays.
+js/garuda.js decodes the same format (decodePath).
+
+Byte layout ("rle1"):
+  varint  number of cells
+  varint  zigzag start row, zigzag start col
+  then one token per run of identical moves:
+    byte  (code << 4) | run      code = index into MOVE_CODES, run 1..15
+          (code << 4) | 0        run follows as a varint (>= 16)
+    0xF0  jump: zigzag varint d_row, zigzag varint d_col (non-adjacent step)
+"""
+
+import base64
+
+ENCODING = "rle1"
+
+# Move code -> (d_row, d_col). 0 = hover in place.
+MOVE_CODES = [(0,0), (-1,0), (1,0), (0,-1), (0,1), (-1,-1), (-1,1), (1,-1), (1,1)]
+MOVE_INDEX = {move: code for code, move in enumerate(MOVE_CODES)}
+JUMP = 0xF
+
+
+# ─────────────────────────────────────────
+# VARINTS
+# ─────────────────────────────────────────
+def _put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_signed(out, n):
+    _put_varint(out, (n << 1) if n >= 0 else (-n << 1) - 1)  # zigzag
+
+
+def _get_varint(data, i):
+    n = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _get_signed(data, i):
+    n, i = _get_varint(data, i)
+    return (n >> 1) ^ -(n & 1), i
+
+
+# ─────────────────────────────────────────
+# ENCODE / DECODE
+# ─────────────────────────────────────────
+def encode_path(path):
+    """List of (row, col) → compact bytes"""
+    out = bytearray()
+    _put_varint(out, len(path))
+    if not path:
+        return bytes(out)
+    _put_signed(out, int(path[0][0]))
+    _put_signed(out, int(path[0][1]))
+
+    def flush(code, run):
+        if run <= 15:
+            out.append((code << 4) | run)
+        else:
+            out.append(code << 4)
+            _put_varint(out, run)
+
+    code, run = None, 0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        move = (int(r1) - int(r0), int(c1) - int(c0))
+        step = MOVE_INDEX.get(move)
+        if step is not None and step == code:
+            run += 1
+            continue
+        if run:
+            flush(code, run)
+        if step is None:
+            out.append(JUMP << 4)
+            _put_signed(out, move[0])
+            _put_signed(out, move[1])
+            code, run = None, 0
+        else:
+            code, run = step, 1
+    if run:
+        flush(code, run)
+    return bytes(out)
+
+
+def decode_path(data):
+    """Compact bytes → list of (row, col)"""
+    n, i = _get_varint(data, 0)
+    if n == 0:
+        return []
+    r, i = _get_signed(data, i)
+    c, i = _get_signed(data, i)
+    path = [(r, c)]
+    while len(path) < n:
+        token = data[i]
+        i += 1
+        code, run = token >> 4, token & 0x0F
+        if code == JUMP:
+            dr, i = _get_signed(data, i)
+            dc, i = _get_signed(data, i)
+            r, c = r + dr, c + dc
+            path.append((r, c))
+            continue
+        if run == 0:
+            run, i = _get_varint(data, i)
+        dr, dc = MOVE_CODES[code]
+        for _ in range(run):
+            r, c = r + dr, c + dc
+            path.append((r, c))
+    return path
+
+
+# ─────────────────────────────────────────
+# JSON HELPERS
+# ─────────────────────────────────────────
+def path_to_json(path, compact=True):
+    """JSON-ready form of a path: a base64 envelope, or the plain [[r, c], ...] list"""
+    if not compact:
+        return [[int(r), int(c)] for r, c in path]
+    return {"encoding": ENCODING,
+            "data": base64.b64encode(encode_path(path)).decode("ascii")}
+
+
+def path_from_json(value):
+    """Inverse of path_to_json; accepts either form"""
+    if isinstance(value, dict):
+        if value.get("encoding") != ENCODING:
+            raise ValueError(f"Unknown path encoding: {value.get('encoding')!r}")
+        return decode_path(base64.b64decode(value["data"]))
+    return [tuple(cell) for cell in value]
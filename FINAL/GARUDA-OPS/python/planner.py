@@ -4,7 +4,9 @@ Stage 2: Boustrophedon Coverage Path + A* with energy cost function
 """
 
 import heapq
+import numpy as np
 from grid import Grid, FREE, OBSTACLE, NO_FLY, START, VISITED
+from search_stats import SearchStats
 
 # Movement directions: Up, Down, Left, Right, and Diagonals
 STRAIGHT_MOVES = [(-1,0),(1,0),(0,-1),(0,1)]
@@ -34,6 +36,53 @@ def proximity_penalty(grid, row, col):
                 penalty += COST_PROXIMITY
     return penalty
 
+def proximity_field(grid):
+    """proximity_penalty() for every cell of the grid at once"""
+    no_fly = np.pad(grid.grid == NO_FLY, 1)
+    count = np.zeros((grid.rows, grid.cols))
+    for dr, dc in ALL_MOVES:
+        count += no_fly[1+dr:1+dr+grid.rows, 1+dc:1+dc+grid.cols]
+    return count * COST_PROXIMITY
+
+def cost_to_go(grid, goals, extra_cost=None):
+    """
+    Reverse Dijkstra over the energy model: cheapest cost from every cell
+    to the nearest goal cell, as a (rows, cols) array (inf = unreachable).
+    Entering a cell costs energy_cost() of a straight move plus its
+    proximity penalty (plus extra_cost, e.g. a danger map, if given).
+    Heading is not tracked, so turn costs are not included.
+    """
+    rows, cols = grid.rows, grid.cols
+    enter = energy_cost(None, STRAIGHT_MOVES[0]) + proximity_field(grid)
+    if extra_cost is not None:
+        enter = enter + extra_cost
+    enter = enter.ravel().tolist()
+    free = np.isin(grid.grid, (FREE, START, VISITED)).ravel().tolist()
+
+    dist = [float('inf')] * (rows * cols)
+    heap = []
+    for r, c in goals:
+        if free[r*cols + c]:
+            dist[r*cols + c] = 0.0
+            heap.append((0.0, r*cols + c))
+    heapq.heapify(heap)
+
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue  # Stale entry
+        r, c = divmod(v, cols)
+        step = d + enter[v]  # Any neighbour u reaches v by entering v
+        for dr, dc in STRAIGHT_MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                u = nr*cols + nc
+                if free[u] and step < dist[u]:
+                    dist[u] = step
+                    heapq.heappush(heap, (step, u))
+
+    return np.array(dist).reshape(rows, cols)
+
 
 # ─────────────────────────────────────────────────────────────
 # STAGE 2A: BOUSTROPHEDON PATH (Lawnmower Pattern)
@@ -67,9 +116,11 @@ def heuristic(a, b):
     """Manhattan distance heuristic"""
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def astar(grid: Grid, start, goal, prev_direction=None):
+def astar(grid: Grid, start, goal, prev_direction=None, proximity=None, stats=None):
     """
     A* pathfinding with custom energy cost.
+    proximity: optional precomputed proximity_penalty() rows (list of lists)
+    stats: optional search_stats.SearchStats to record this query in
     Returns (path as list of (row,col), total_energy_cost)
     """
     open_set = []
@@ -79,8 +130,19 @@ def astar(grid: Grid, start, goal, prev_direction=None):
     g_score = {start: 0}
     direction_map = {start: prev_direction}
 
+    # Counters are only maintained when stats is given
+    if stats is not None:
+        stats.start()
+    pops = stale = max_open = 0
+    result = [], float('inf')  # No path found
+
     while open_set:
         current_f, current, cur_dir = heapq.heappop(open_set)
+        if stats is not None:
+            pops += 1
+            max_open = max(max_open, len(open_set) + 1)
+            if current_f > g_score[current] + heuristic(current, goal):
+                stale += 1  # Cheaper route found since push (still expanded, as before)
 
         if current == goal:
             # Reconstruct path
@@ -90,7 +152,8 @@ def astar(grid: Grid, start, goal, prev_direction=None):
                 current = came_from[current]
             path.append(start)
             path.reverse()
-            return path, g_score[goal]
+            result = path, g_score[goal]
+            break
 
         r, c = current
         for dr, dc in STRAIGHT_MOVES:
@@ -102,7 +165,10 @@ def astar(grid: Grid, start, goal, prev_direction=None):
 
             new_dir = (dr, dc)
             move_cost = energy_cost(cur_dir, new_dir)
-            move_cost += proximity_penalty(grid, nr, nc)
+            if proximity is None:
+                move_cost += proximity_penalty(grid, nr, nc)
+            else:
+                move_cost += proximity[nr][nc]
 
             tentative_g = g_score[current] + move_cost
 
@@ -113,16 +179,150 @@ def astar(grid: Grid, start, goal, prev_direction=None):
                 direction_map[neighbor] = new_dir
                 heapq.heappush(open_set, (f_score, neighbor, new_dir))
 
-    return [], float('inf')  # No path found
+    if stats is not None:
+        stats.stop()
+        stats.pops += pops
+        stats.pushes += pops + len(open_set)  # Every push was either popped or is still queued
+        stats.stale_pops += stale
+        stats.expanded += pops - (1 if result[0] else 0)  # The goal pop ends the search
+        stats.max_open = max(stats.max_open, max_open)
+    return result
 
 
 # ─────────────────────────────────────────────────────────────
-# STAGE 2C: OPTIMISED COVERAGE PLANNER
+# STAGE 2C: RETURN-TO-HOME COST FIELD
+# ─────────────────────────────────────────────────────────────
+
+class ReturnField:
+    """
+    Energy to fly home from every cell: cost_to_go() to one home cell, kept
+    as flat lists so a lookup is O(1). It watches the grid, so a cell that
+    becomes an obstacle only repairs the cells whose way home ran through it.
+    """
+
+    def __init__(self, grid: Grid, home):
+        self.grid = grid
+        self.home = home
+        self.rebuild(grid)
+        grid.watch(self)
+
+    def rebuild(self, grid):
+        self.rows, self.cols = grid.rows, grid.cols
+        self.no_fly = (grid.grid == NO_FLY).ravel().tolist()
+        self.proximity = proximity_field(grid).ravel().tolist()
+        self.enter = [energy_cost(None, STRAIGHT_MOVES[0]) + p for p in self.proximity]
+        self.free = np.isin(grid.grid, (FREE, START, VISITED)).ravel().tolist()
+        self.dist = cost_to_go(grid, [self.home]).ravel().tolist()
+
+    def cost(self, cell):
+        """Cheapest energy home from cell, turns not included (inf = cut off)"""
+        return self.dist[cell[0]*self.cols + cell[1]]
+
+    def _neighbors(self, v):
+        r, c = divmod(v, self.cols)
+        for dr, dc in STRAIGHT_MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                yield nr*self.cols + nc, (dr, dc)
+
+    def path_home(self, cell, prev_dir=None):
+        """
+        Follow the field downhill to home. Returns (path, energy), energy
+        as astar() counts it (turns included), which is at most
+        COST_TURN / COST_STRAIGHT times cost(cell).
+        """
+        v = cell[0]*self.cols + cell[1]
+        home = self.home[0]*self.cols + self.home[1]
+        if self.dist[v] == float('inf'):
+            return [], float('inf')
+        path, energy, direction = [cell], 0.0, prev_dir
+        while v != home:
+            best = None
+            for u, move in self._neighbors(v):
+                if self.free[u] and (best is None or self.enter[u] + self.dist[u] < best[0]):
+                    best = (self.enter[u] + self.dist[u], u, move)
+            _, v, move = best
+            energy += energy_cost(direction, move) + self.proximity[v]
+            direction = move
+            path.append(divmod(v, self.cols))
+        return path, energy
+
+    def block(self, row, col):
+        """Repair the field after (row, col) became an obstacle"""
+        inf = float('inf')
+        dist, enter, free = self.dist, self.enter, self.free
+        v = row*self.cols + col
+        if self.no_fly[v]:
+            self.rebuild(self.grid)  # No-fly turned obstacle: neighbours' proximity penalties change
+            return
+        if not free[v]:
+            return
+        free[v] = False
+        if dist[v] == inf:
+            return  # Was already cut off from home
+        if (row, col) == self.home:
+            self.dist = [inf] * len(dist)
+            return
+
+        # Cells whose every cheapest way home ran through v: a cell is lost
+        # once none of its neighbours still offers its old cost
+        lost = {v}
+        stack = [v]
+        while stack:
+            w = stack.pop()
+            for x, _ in self._neighbors(w):
+                if x in lost or not free[x] or dist[x] != enter[w] + dist[w]:
+                    continue  # w was not on x's way home
+                if any(free[u] and u not in lost and dist[x] == enter[u] + dist[u]
+                       for u, _ in self._neighbors(x)):
+                    continue
+                lost.add(x)
+                stack.append(x)
+
+        # Re-run Dijkstra over the lost cells only, seeded from their
+        # unaffected neighbours (whose costs are still exact)
+        for x in lost:
+            dist[x] = inf
+        heap = []
+        for x in lost:
+            if free[x]:
+                best = min((enter[u] + dist[u] for u, _ in self._neighbors(x) if free[u]),
+                           default=inf)
+                if best < inf:
+                    dist[x] = best
+                    heap.append((best, x))
+        heapq.heapify(heap)
+        while heap:
+            d, w = heapq.heappop(heap)
+            if d > dist[w]:
+                continue  # Stale entry
+            step = d + enter[w]
+            for u, _ in self._neighbors(w):
+                if free[u] and step < dist[u]:
+                    dist[u] = step
+                    heapq.heappush(heap, (step, u))
+
+
+# ─────────────────────────────────────────────────────────────
+# STAGE 2D: OPTIMISED COVERAGE PLANNER
 # ─────────────────────────────────────────────────────────────
 
 class CoveragePlanner:
-    def __init__(self, grid: Grid, battery: float = 500.0):
+    def __init__(self, grid: Grid, battery: float = 500.0, verbose: bool = True, index=None,
+                 instrument: bool = False, return_home: bool = False):
+        """
+        index: optional map_index.MapIndex built for this grid's layout
+        instrument=True totals A* search counters over every leg (stats()["search"])
+        return_home=True always keeps enough battery to fly back to the start:
+        waypoints that could not be flown home from are skipped (most without
+        searching, using a ReturnField) and the drone flies home at the end
+        """
+        if index is not None and not index.matches(grid):
+            raise ValueError("Map index was built for a different layout — re-run preprocess")
         self.grid = grid
+        self.verbose = verbose  # False = headless, no stdout
+        self.index = index
+        self.search_stats = SearchStats() if instrument else None
         self.battery = battery
         self.max_battery = battery
         self.current_pos = grid.start
@@ -130,6 +330,9 @@ class CoveragePlanner:
         self.total_energy = 0.0
         self.prev_dir = None
         self.waypoints_visited = 0
+        self.home_field = ReturnField(grid, grid.start) if return_home else None
+        self.waypoints_pruned = 0   # Skipped to keep the way home affordable
+        self.returned_home = False
 
     def plan(self):
         """
@@ -138,12 +341,38 @@ class CoveragePlanner:
         2. Use A* to connect each waypoint with energy-aware routing
         3. Stop if battery runs out
         """
-        waypoints = boustrophedon_path(self.grid)
+        for _ in self.iter_plan():
+            pass
+        return self.full_path
 
-        print(f"📍 Total waypoints to cover: {len(waypoints)}")
-        print(f"🔋 Starting battery: {self.battery}")
-        print(f"🚁 Starting position: {self.current_pos}")
-        print("-" * 50)
+    def iter_plan(self):
+        """
+        plan() as a generator: yields a telemetry event (dict) for every
+        flown leg as soon as it is planned, then a final "done" event.
+        """
+        if self.index is None:
+            waypoints = boustrophedon_path(self.grid)
+            proximity = None
+        else:
+            waypoints = self.index.sweep_path()
+            proximity = self.index.proximity.tolist()
+        # Cells walled off from the drone would each cost A* a flood of the
+        # whole reachable area just to find no path — drop them up front
+        reachable = self.grid.connectivity(self.index).reachable_from(self.current_pos, waypoints)
+        unreachable = len(waypoints) - len(reachable)
+        waypoints = reachable
+        free_total = int(np.isin(self.grid.grid, (FREE, START, VISITED)).sum())
+        covered = int(np.isin(self.grid.grid, (START, VISITED)).sum())
+
+        if self.verbose:
+            print(f"📍 Total waypoints to cover: {len(waypoints)}")
+            if unreachable:
+                print(f"🚫 Unreachable waypoints skipped: {unreachable}")
+            print(f"🔋 Starting battery: {self.battery}")
+            print(f"🚁 Starting position: {self.current_pos}")
+            print("-" * 50)
+        yield {"type": "start", "waypoints": len(waypoints), "unreachable": unreachable,
+               "battery": self.battery, "position": self.current_pos}
 
         for target in waypoints:
             if target == self.current_pos:
@@ -154,53 +383,115 @@ class CoveragePlanner:
             if not self.grid.is_free(*target):
                 continue
 
+            # O(1) prune: every move costs at least COST_STRAIGHT, and the
+            # way home from target at least the field's cost
+            if (self.home_field is not None and heuristic(self.current_pos, target) * COST_STRAIGHT
+                    + self.home_field.cost(target) > self.battery):
+                self.waypoints_pruned += 1
+                continue
+
             # Find energy-optimal path to next waypoint
-            path, cost = astar(self.grid, self.current_pos, target, self.prev_dir)
+            path, cost = astar(self.grid, self.current_pos, target, self.prev_dir, proximity,
+                               self.search_stats)
 
             if not path or cost == float('inf'):
                 continue  # Can't reach this cell, skip
 
-            if self.battery - cost < 0:
-                print(f"⚠️  Battery critical! Stopping at {self.current_pos}")
-                print(f"   Remaining battery: {self.battery:.2f}")
+            if self.home_field is not None:
+                if not self._can_return(target, path, cost):
+                    self.waypoints_pruned += 1
+                    continue
+            elif self.battery - cost < 0:
+                if self.verbose:
+                    print(f"⚠️  Battery critical! Stopping at {self.current_pos}")
+                    print(f"   Remaining battery: {self.battery:.2f}")
+                yield {"type": "battery_critical", "position": self.current_pos, "battery": self.battery}
                 break
 
-            # Execute the path
-            for step in path[1:]:
-                self.full_path.append(step)
-                self.grid.mark_visited(*step)
-
-            self.battery -= cost
-            self.total_energy += cost
-            self.current_pos = target
+            covered += self._fly(path, cost)
             self.waypoints_visited += 1
-
-            # Update previous direction
-            if len(path) >= 2:
-                dr = path[-1][0] - path[-2][0]
-                dc = path[-1][1] - path[-2][1]
-                self.prev_dir = (dr, dc)
-
-        return self.full_path
+            yield {"type": "leg", "target": target, "path": path[1:], "cost": cost,
+                   "battery": self.battery,
+                   "coverage": round(covered / free_total * 100, 2) if free_total else 0}
+
+        if self.home_field is not None:
+            path, cost = self.home_field.path_home(self.current_pos, self.prev_dir)
+            if len(path) > 1:
+                covered += self._fly(path, cost)
+                if self.verbose:
+                    print(f"🏠 Returned home using {cost:.1f} battery "
+                          f"({self.waypoints_pruned} waypoints skipped to keep the way home)")
+                yield {"type": "return_home", "path": path[1:], "cost": cost,
+                       "battery": self.battery,
+                       "coverage": round(covered / free_total * 100, 2) if free_total else 0}
+            self.returned_home = self.current_pos == self.grid.start
+
+        yield {"type": "done", "steps": len(self.full_path), "battery": self.battery,
+               "total_energy": self.total_energy, "waypoints_visited": self.waypoints_visited}
+
+    def _can_return(self, target, path, cost):
+        """Would the battery left after this leg still fly home from target?"""
+        left = self.battery - cost
+        home = self.home_field.cost(target)
+        if home * COST_TURN / COST_STRAIGHT <= left:
+            return True   # Even the worst case (a turn every move) fits
+        if home > left:
+            return False  # Even the best case does not
+        arrival = (path[-1][0] - path[-2][0], path[-1][1] - path[-2][1])
+        return self.home_field.path_home(target, arrival)[1] <= left
+
+    def _fly(self, path, cost):
+        """Execute a planned path; returns how many cells it newly covered"""
+        covered = 0
+        for step in path[1:]:
+            self.full_path.append(step)
+            if self.grid.grid[step[0]][step[1]] == FREE:
+                covered += 1
+            self.grid.mark_visited(*step)
+
+        self.battery -= cost
+        self.total_energy += cost
+        self.current_pos = path[-1]
+
+        # Update previous direction
+        if len(path) >= 2:
+            dr = path[-1][0] - path[-2][0]
+            dc = path[-1][1] - path[-2][1]
+            self.prev_dir = (dr, dc)
+        return covered
 
     def stats(self):
         coverage = self.grid.coverage_percentage()
         battery_used = self.max_battery - self.battery
         battery_pct = (battery_used / self.max_battery) * 100
-        print("\n" + "=" * 50)
-        print("📊 MISSION STATISTICS")
-        print("=" * 50)
-        print(f"  ✅ Area Coverage     : {coverage}%")
-        print(f"  🔋 Battery Used      : {battery_used:.1f} / {self.max_battery} ({battery_pct:.1f}%)")
-        print(f"  🔋 Battery Remaining : {self.battery:.1f}")
-        print(f"  📍 Total Steps       : {len(self.full_path)}")
-        print(f"  ⚡ Total Energy Cost : {self.total_energy:.2f}")
-        print(f"  🎯 Waypoints Visited : {self.waypoints_visited}")
-        print("=" * 50)
-        return {
+        if self.verbose:
+            print("\n" + "=" * 50)
+            print("📊 MISSION STATISTICS")
+            print("=" * 50)
+            print(f"  ✅ Area Coverage     : {coverage}%")
+            print(f"  🔋 Battery Used      : {battery_used:.1f} / {self.max_battery} ({battery_pct:.1f}%)")
+            print(f"  🔋 Battery Remaining : {self.battery:.1f}")
+            print(f"  📍 Total Steps       : {len(self.full_path)}")
+            print(f"  ⚡ Total Energy Cost : {self.total_energy:.2f}")
+            print(f"  🎯 Waypoints Visited : {self.waypoints_visited}")
+            if self.home_field is not None:
+                print(f"  🏠 Returned Home     : {'yes' if self.returned_home else 'no'} "
+                      f"({self.waypoints_pruned} waypoints pruned)")
+            if self.search_stats is not None:
+                s = self.search_stats
+                print(f"  🔎 A* Searches       : {s.queries} ({s.expanded} expanded, "
+                      f"{s.seconds*1000:.1f} ms)")
+            print("=" * 50)
+        result = {
             "coverage_pct": coverage,
             "battery_used": battery_used,
             "battery_remaining": self.battery,
             "total_steps": len(self.full_path),
             "total_energy": self.total_energy,
         }
+        if self.home_field is not None:
+            result["returned_home"] = self.returned_home
+            result["waypoints_pruned"] = self.waypoints_pruned
+        if self.search_stats is not None:
+            result["search"] = self.search_stats.as_dict()
+        return result
@@ -0,0 +1,53 @@
+"""
+search_stats.py - Search Instrumentation
+Opt-in counters for the planners' searches. Pass a SearchStats as
+stats= to astar() / DStarLite and it accumulates over every query it
+sees; searches given no stats object skip all bookkeeping.
+"""
+
+import time
+
+
+class SearchStats:
+    """
+    queries      searches recorded
+    expanded     nodes taken off the open set and expanded
+    pushes/pops  open-set (heap) operations
+    stale_pops   popped entries made outdated by a cheaper route found later
+    max_open     largest open-set size seen in any query
+    seconds      total wall time; max_seconds = slowest single query
+    """
+
+    FIELDS = ("queries", "expanded", "pushes", "pops", "stale_pops", "max_open",
+              "seconds", "max_seconds")
+
+    def __init__(self):
+        self.queries = self.expanded = self.pushes = self.pops = 0
+        self.stale_pops = self.max_open = 0
+        self.seconds = self.max_seconds = 0.0
+        self._t0 = None
+
+    def start(self):
+        self.queries += 1
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        elapsed = time.perf_counter() - self._t0
+        self.seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def merge(self, other):
+        """Add another SearchStats' totals to this one"""
+        for field in ("queries", "expanded", "pushes", "pops", "stale_pops", "seconds"):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        self.max_open = max(self.max_open, other.max_open)
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+
+    def as_dict(self):
+        d = {field: getattr(self, field) for field in self.FIELDS}
+        d["seconds"] = round(d["seconds"], 6)
+        d["max_seconds"] = round(d["max_seconds"], 6)
+        return d
+
+    def __repr__(self):
+        return f"SearchStats({self.as_dict()})"
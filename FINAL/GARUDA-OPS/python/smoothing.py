@@ -0,0 +1,122 @@
+"""
+smoothing.py - Any-Angle Path Smoothing
+Stage 2E: Post-processes the cell-by-cell staircases from astar() and
+DStarLite.extract_path() (or the root app's astar paths) into a few
+straight segments (line-of-sight pruning), so the flight controller gets
+a short waypoint list instead of one command per cell.
+
+A shortcut is only taken when the straight segment touches no blocked or
+no-fly cell (corners included, so it never squeezes between two diagonal
+obstacles) and costs no more energy than the staircase it replaces —
+no-fly proximity penalties are charged per cell the segment touches, so
+hugging a no-fly zone is never cheaper than keeping the path's clearance.
+The segment geometry and the pruning loop live in line_of_sight.py, which
+the root app's astar_module.smooth_path() shares.
+
+Run:  python -m smoothing          (sample map: A* and D* Lite, before/after)
+"""
+
+import numpy as np
+
+from grid import FREE, START, VISITED
+from line_of_sight import headings, octile, prune, segment_cells
+from planner import COST_STRAIGHT, COST_TURN, COST_DIAGONAL, proximity_field
+
+
+# ─────────────────────────────────────────
+# SEGMENT COSTS
+# ─────────────────────────────────────────
+def segment_costs(free, proximity, start, ends):
+    """
+    (clear, cost) per segment over 2D free / proximity arrays: clear = no
+    touched cell is blocked; cost = octile length (COST_STRAIGHT per
+    axis-aligned cell, COST_DIAGONAL per diagonal one) plus the proximity
+    penalty of every touched cell except the one the segment starts in.
+    """
+    ends = np.asarray(ends).reshape(-1, 2)
+    starts = np.broadcast_to(np.asarray(start).reshape(-1, 2), ends.shape)
+    cols = free.shape[1]
+    seg, flat = segment_cells(starts, ends, cols)
+    n = len(ends)
+    blocked = np.bincount(seg, weights=~free.ravel()[flat], minlength=n)
+    penalty = np.bincount(seg, weights=proximity.ravel()[flat], minlength=n)
+    penalty -= proximity.ravel()[starts[:, 0] * cols + starts[:, 1]]
+    return blocked == 0, octile(starts, ends, COST_STRAIGHT, COST_DIAGONAL) + penalty
+
+
+# ─────────────────────────────────────────
+# ENERGY + SMOOTHING
+# ─────────────────────────────────────────
+def _masks(grid, proximity):
+    free = np.isin(grid.grid, (FREE, START, VISITED))
+    if proximity is None:
+        proximity = proximity_field(grid)
+    return free, np.asarray(proximity, dtype=float)
+
+
+def path_energy(grid, points, prev_direction=None, proximity=None):
+    """
+    Energy of flying straight between consecutive points: segment_costs()
+    plus (COST_TURN - COST_STRAIGHT) at every change of heading. For a
+    4-connected cell path this is energy_cost() plus proximity_penalty()
+    summed move by move.
+    proximity: optional precomputed proximity_field(grid)
+    """
+    if len(points) < 2:
+        return 0.0
+    return _energy(*_masks(grid, proximity), points, prev_direction)
+
+
+def _energy(free, proximity, points, prev_direction):
+    points = np.asarray(points)
+    _, cost = segment_costs(free, proximity, points[:-1], points[1:])
+    _, turned = headings(points, prev_direction)
+    return float(cost.sum() + (COST_TURN - COST_STRAIGHT) * turned.sum())
+
+
+def smooth_path(grid, path, prev_direction=None, proximity=None):
+    """
+    Line-of-sight pruning (line_of_sight.prune): from each kept waypoint,
+    jump to the farthest later corner of the staircase that is in sight and
+    no dearer to fly straight to than along the path.
+    Returns (waypoints, energy_before, energy_after) as path_energy() counts
+    them; energy_after is never above energy_before.
+    """
+    path = [tuple(cell) for cell in path]
+    if len(path) < 3:
+        before = path_energy(grid, path, prev_direction, proximity)
+        return path, before, before
+    free, prox = _masks(grid, proximity)
+    points = np.asarray(path)
+
+    _, turned = headings(points, prev_direction)
+    turn_extra = (COST_TURN - COST_STRAIGHT) * turned          # Paid on leaving cell i
+    _, step = segment_costs(free, prox, points[:-1], points[1:])
+    spent = np.concatenate([[0.0], np.cumsum(step + turn_extra)])  # Energy to reach cell i
+    keep = prune(points, spent, lambda i, cand: segment_costs(free, prox, points[i], points[cand]),
+                 turn_extra)
+
+    waypoints = [path[k] for k in keep]
+    return waypoints, float(spent[-1]), _energy(free, prox, waypoints, prev_direction)
+
+
+# ─────────────────────────────────────────
+# DEMO
+# ─────────────────────────────────────────
+if __name__ == "__main__":
+    from grid import create_sample_map
+    from planner import astar
+    from dynamic_replanner import DStarLite
+
+    grid = create_sample_map()
+    goal = (grid.rows - 1, grid.cols - 1)
+    a_path, _ = astar(grid, grid.start, goal)
+    d = DStarLite(grid, grid.start, goal, verbose=False)
+    d.compute_shortest_path()
+
+    print("✂️  ANY-ANGLE SMOOTHING")
+    for name, path in (("A*", a_path), ("D* Lite", d.extract_path())):
+        waypoints, before, after = smooth_path(grid, path)
+        print(f"   {name:8s}: {len(path)} cells → {len(waypoints)} waypoints | "
+              f"energy {before:.1f} → {after:.1f}")
+        print(f"             {waypoints}")
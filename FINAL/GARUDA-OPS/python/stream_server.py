@@ -0,0 +1,98 @@
+"""
+stream_server.py - Live Mission Telemetry (Server-Sent Events)
+Streams the backend mission to the browser as it is computed:
+Stage 2 coverage legs, then Stage 3 step-by-step flight with D* Lite
+replanning events, so garuda.js can render live without re-running the
+planning logic itself.
+
+Run:  pip install flask && python stream_server.py
+Open: GET http://localhost:5001/mission/stream
+      GET http://localhost:5001/mission/path   (whole mission, one response)
+Add ?paths=compact to send paths base64 run-length encoded (path_codec.py).
+"""
+
+import json
+
+from flask import Flask, Response, jsonify, request, stream_with_context
+
+from grid import create_sample_map
+from planner import CoveragePlanner
+from dynamic_replanner import DynamicMission
+from path_codec import path_to_json
+from map_index import MapIndex
+
+app = Flask(__name__)
+
+# Same mid-flight obstacles as main.py: {step: (row, col)}
+DEFAULT_OBSTACLES = {50: (3, 10), 120: (7, 14), 200: (15, 8)}
+
+INDEX = MapIndex.build(create_sample_map())   # Derived map data, built once per process
+
+PATH_FIELDS = ("path", "new_path")   # Event fields holding a list of cells
+CORS = {"Access-Control-Allow-Origin": "*"}   # Frontend is opened from file:// or another port
+
+
+def sse(stage, event):
+    """One SSE message; the event type becomes the SSE event name"""
+    payload = json.dumps({"stage": stage, **event}, default=list)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+def encode_paths(event, compact):
+    """Swap path fields for their compact encoding when requested"""
+    if not compact:
+        return event
+    return {k: path_to_json(v) if k in PATH_FIELDS else v for k, v in event.items()}
+
+
+def mission_events(battery, compact=False, return_home=False):
+    planner = CoveragePlanner(create_sample_map(), battery=battery, verbose=False, index=INDEX,
+                              return_home=return_home)
+    for event in planner.iter_plan():
+        yield sse("plan", encode_paths(event, compact))
+
+    mission = DynamicMission(create_sample_map(), planner.full_path, battery,
+                             DEFAULT_OBSTACLES, verbose=False, index=INDEX)
+    for event in mission.iter_run():
+        yield sse("flight", encode_paths(event, compact))
+
+
+def request_options():
+    """?battery=<float>, ?paths=compact, ?rth=1 (plan with return-to-home)"""
+    return (float(request.args.get("battery", 500.0)), request.args.get("paths") == "compact",
+            request.args.get("rth") == "1")
+
+
+@app.route("/mission/stream")
+def mission_stream():
+    battery, compact, return_home = request_options()
+    return Response(
+        stream_with_context(mission_events(battery, compact, return_home)),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",            # Don't let proxies buffer the stream
+            **CORS,
+        },
+    )
+
+
+@app.route("/mission/path")
+def mission_path():
+    """Planned and executed paths of a whole mission in one response"""
+    battery, compact, return_home = request_options()
+    planner = CoveragePlanner(create_sample_map(), battery=battery, verbose=False, index=INDEX,
+                              return_home=return_home)
+    planner.plan()
+    mission = DynamicMission(create_sample_map(), planner.full_path, battery,
+                             DEFAULT_OBSTACLES, verbose=False, index=INDEX)
+    executed, replans = mission.run()
+    return jsonify({
+        "planned_path": path_to_json(planner.full_path, compact),
+        "executed_path": path_to_json(executed, compact),
+        "replannings": len(replans),
+    }), 200, CORS
+
+
+if __name__ == "__main__":
+    app.run(port=5001, threaded=True)
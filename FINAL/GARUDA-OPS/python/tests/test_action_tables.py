@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+
+from grid import create_sample_map
+from rl_agent import ACTIONS, COLS, MASK_ACTIONS, ROWS, DroneMemory, QLearningDrone
+
+
+def agent(grid_cells, memory, epsilon=0.0):
+    return QLearningDrone(grid_cells, memory, mission_num=1, verbose=False, epsilon=epsilon)
+
+
+def test_mask_actions_lists_the_set_bits():
+    assert MASK_ACTIONS[0] == () and MASK_ACTIONS[(1 << len(ACTIONS)) - 1] == tuple(range(len(ACTIONS)))
+    assert MASK_ACTIONS[0b1010] == (1, 3)
+
+
+def test_valid_masks_match_the_grid():
+    drone = agent(create_sample_map().grid, DroneMemory())
+    for r in range(ROWS):
+        for c in range(COLS):
+            expected = {i for i, (dr, dc) in enumerate(ACTIONS) if drone._is_valid(r + dr, c + dc)}
+            assert set(MASK_ACTIONS[drone._valid_mask[r * COLS + c]]) == expected
+
+
+def test_patched_tables_match_a_fresh_build_after_an_obstacle():
+    memory = DroneMemory()
+    drone = agent(create_sample_map().grid, memory)
+    drone.step(3, dynamic_obstacle_pos=(0, 3))        # Reveal an obstacle next to the path
+    assert drone.obstacles_found == [(0, 3)]
+    fresh = agent(drone.grid, memory)
+    assert drone._valid_mask == fresh._valid_mask
+    assert drone._danger == pytest.approx(fresh._danger)
+    for a, b in zip(drone._exploit_pen, fresh._exploit_pen):
+        assert a == pytest.approx(b)
+    for a, b in zip(drone._explore_cum, fresh._explore_cum):
+        assert a == pytest.approx(b)
+
+
+def test_greedy_choice_is_the_best_penalised_valid_action():
+    memory = DroneMemory()
+    memory.record_obstacle(3, 3, mission=1)           # Some danger around (3, 3)
+    memory.q[:] = np.random.default_rng(0).normal(size=memory.q.shape)
+    drone = agent(create_sample_map().grid, memory)
+    random.seed(0)
+    for r, c in [(0, 0), (3, 2), (4, 4), (10, 10)]:
+        drone.pos = (r, c)
+        valid = MASK_ACTIONS[drone._valid_mask[r * COLS + c]]
+        scores = {i: memory.q[r, c, i] - drone._exploit_pen[r * COLS + c][i] for i in valid}
+        assert drone.choose_action() == max(scores, key=scores.get)
+
+
+def test_q_table_view_keeps_the_on_disk_format():
+    memory = DroneMemory()
+    memory.set_q((2, 5), 1, 1.5)
+    assert memory.q_table == {"(2, 5)": [0.0, 1.5, 0.0, 0.0]}
+    assert memory.get_q((2, 5), 1) == 1.5
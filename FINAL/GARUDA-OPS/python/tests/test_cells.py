@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from cells import CellPath, CellSet
+
+
+def test_cell_path_reads_back_like_a_list_of_tuples():
+    cells = [(0, 0), (0, 1), (1, 1), (2, 4)]
+    path = CellPath((3, 5), cells)
+    path.append((2, 3))
+    cells.append((2, 3))
+    assert len(path) == 5 and path[2] == (1, 1) and path[-1] == (2, 3)
+    assert path[1:3] == [(0, 1), (1, 1)] and list(path) == cells and path == cells
+    assert np.array_equal(np.asarray(path), np.array(cells))
+    assert path.flat().tolist() == [r * 5 + c for r, c in cells]
+
+
+def test_cell_set_counts_each_cell_once():
+    visited = CellSet((4, 6), [(0, 0)])
+    visited.add((3, 5))
+    visited.add((3, 5))
+    assert visited.add_index(1 * 6 + 2) and not visited.add_index(0)
+    assert len(visited) == 3 and (1, 2) in visited and (2, 2) not in visited
+    assert (-1, 0) not in visited and (0, 6) not in visited   # Off the grid: just absent
+    assert list(visited) == [(0, 0), (1, 2), (3, 5)]            # Row-major
+    assert visited.mask().sum() == 3 and visited.mask()[3, 5]
+
+
+def test_cell_set_rejects_cells_off_the_grid():
+    with pytest.raises(IndexError):
+        CellSet((2, 2)).add((2, 0))
+
+
+def test_grid_re_exports_the_same_classes():
+    import grid
+    assert grid.CellPath is CellPath and grid.CellSet is CellSet
@@ -0,0 +1,59 @@
+import heapq
+from collections import deque
+
+import pytest
+
+import dynamic_replanner
+from dynamic_replanner import DStarLite
+from mapgen import generate_map
+
+MAX_POPS = 200_000   # Far above what a 30x30 search needs; a stuck search hits it
+
+
+class CountingHeap:
+    """heapq stand-in that fails the test instead of spinning forever"""
+    heappush = staticmethod(heapq.heappush)
+
+    def __init__(self):
+        self.pops = 0
+
+    def heappop(self, heap):
+        self.pops += 1
+        if self.pops > MAX_POPS:
+            raise AssertionError("compute_shortest_path() did not terminate")
+        return heapq.heappop(heap)
+
+
+def bfs_length(grid, start, goal):
+    """Moves on the shortest 4-connected path, or None"""
+    dist = {start: 0}
+    todo = deque([start])
+    while todo:
+        r, c = cell = todo.popleft()
+        if cell == goal:
+            return dist[cell]
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if (0 <= nr < grid.rows and 0 <= nc < grid.cols and (nr, nc) not in dist
+                    and grid.is_free(nr, nc)):
+                dist[(nr, nc)] = dist[cell] + 1
+                todo.append((nr, nc))
+    return None
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_paths_match_bfs_before_and_after_a_new_obstacle(seed, monkeypatch):
+    monkeypatch.setattr(dynamic_replanner, "heapq", CountingHeap())
+    grid = generate_map(30, seed=seed, style="scatter", density=0.3, no_fly=0.02)
+    start, goal = (0, 0), (29, 29)
+    d = DStarLite(grid, start, goal, verbose=False)
+    d.compute_shortest_path()
+    path = d.extract_path()
+    expected = bfs_length(grid, start, goal)
+    assert (len(path) - 1 if path else None) == expected
+
+    if path and len(path) > 4:
+        d.notify_obstacle(path[len(path) // 2])   # Block the planned route mid-way
+        path = d.extract_path()
+        expected = bfs_length(grid, start, goal)
+        assert (len(path) - 1 if path else None) == expected
+        assert all(grid.is_free(*cell) for cell in path)
@@ -0,0 +1,44 @@
+import inspect
+
+from rl_agent import (CONVERGE_COV_STD, CONVERGE_Q_DELTA, CONVERGE_WINDOW, DroneMemory,
+                      run_rl_missions)
+
+
+def mission(coverage, q_delta=CONVERGE_Q_DELTA / 2, ended_early=False):
+    return {"coverage": coverage, "q_delta": q_delta, "ended_early": ended_early}
+
+
+def test_settled_full_length_missions_converge():
+    memory = DroneMemory()
+    memory.mission_history = [mission(30.0) for _ in range(CONVERGE_WINDOW)]
+    assert memory.converged()
+
+
+def test_plateau_truncated_missions_do_not_count():
+    memory = DroneMemory()
+    memory.mission_history = ([mission(30.0) for _ in range(CONVERGE_WINDOW - 1)]
+                              + [mission(30.0, ended_early=True) for _ in range(10)])
+    assert not memory.converged()
+    memory.mission_history.append(mission(30.0))
+    assert memory.converged()
+
+
+def test_collapsed_coverage_is_not_convergence():
+    memory = DroneMemory()
+    memory.mission_history = ([mission(30.0) for _ in range(CONVERGE_WINDOW)]
+                              + [mission(10.0) for _ in range(CONVERGE_WINDOW)])
+    assert not memory.converged()   # Settled, but at a third of the first window
+
+
+def test_changing_q_or_coverage_is_not_convergence():
+    memory = DroneMemory()
+    memory.mission_history = [mission(30.0, q_delta=CONVERGE_Q_DELTA * 2)
+                              for _ in range(CONVERGE_WINDOW)]
+    assert not memory.converged()
+    memory.mission_history = [mission(30.0 + (i % 2) * 3 * CONVERGE_COV_STD)
+                              for i in range(CONVERGE_WINDOW)]
+    assert not memory.converged()
+
+
+def test_early_stop_is_opt_in():
+    assert inspect.signature(run_rl_missions).parameters["early_stop"].default is False
@@ -0,0 +1,34 @@
+import numpy as np
+
+from dynamic_replanner import DStarLite, DynamicMission
+from grid import create_sample_map
+from planner import CoveragePlanner
+from rl_agent import run_rl_missions
+
+METRICS = ("coverage", "battery_used", "steps", "replannings", "obstacles_found", "reward")
+
+
+def test_headless_training_prints_nothing_and_returns_arrays(tmp_path, capsys):
+    calls = []
+    results = run_rl_missions(num_missions=2, steps_per_mission=30, verbose=False, seed=0,
+                              progress=lambda i, m: calls.append((i, m)),
+                              memory_file=str(tmp_path / "memory.json"))
+    assert capsys.readouterr().out == ""
+    for name in METRICS:
+        assert isinstance(results[name], np.ndarray)
+        assert len(results[name]) == 2
+    assert [i for i, _ in calls] == [0, 1]
+    assert [m["coverage"] for _, m in calls] == list(results["coverage"])
+
+
+def test_headless_planners_print_nothing(capsys):
+    grid = create_sample_map()
+    planner = CoveragePlanner(grid, battery=500.0, verbose=False)
+    path = planner.plan()
+    d = DStarLite(grid, grid.start, (19, 19), verbose=False)
+    d.compute_shortest_path()
+    mission = DynamicMission(grid, path, battery=500.0, dynamic_obstacle_schedule={5: (2, 2)},
+                             verbose=False)
+    mission.run()
+    assert capsys.readouterr().out == ""
+    assert mission.executed_path
@@ -0,0 +1,119 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+import map_index
+from dynamic_replanner import DStarLite
+from grid import create_sample_map, save_map
+from map_index import MapIndex, free_mask, label_components, load_for, sidecar_path
+from mapgen import generate_map
+from planner import CoveragePlanner, boustrophedon_path
+from search_stats import SearchStats
+
+
+def flood_labels(free):
+    """Reference labelling: one BFS per component"""
+    labels = np.full(free.shape, -1)
+    count = 0
+    for start in zip(*np.nonzero(free)):
+        if labels[start] >= 0:
+            continue
+        labels[start] = count
+        todo = deque([start])
+        while todo:
+            r, c = todo.popleft()
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < free.shape[0] and 0 <= nc < free.shape[1] and free[nr, nc] and labels[nr, nc] < 0:
+                    labels[nr, nc] = count
+                    todo.append((nr, nc))
+        count += 1
+    return labels
+
+
+def same_partition(a, b):
+    """Equal up to renaming the components"""
+    if not np.array_equal(a < 0, b < 0):
+        return False
+    pairs = np.unique(np.stack([a[a >= 0], b[b >= 0]]), axis=1)
+    return len(set(pairs[0])) == len(set(pairs[1])) == pairs.shape[1]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_labels_match_a_flood_fill(seed):
+    free = np.random.default_rng(seed).random((40, 30)) > 0.45
+    assert same_partition(label_components(free), flood_labels(free))
+
+
+def test_sidecar_round_trips(tmp_path):
+    grid = create_sample_map()
+    map_path = str(tmp_path / "sample.npy")
+    save_map(grid, map_path)
+    MapIndex.build(grid).save(sidecar_path(map_path))
+    index = load_for(grid, map_path)
+    built = MapIndex.build(grid)
+    assert index is not None and index.layout_hash == built.layout_hash
+    for field in ("free", "labels", "proximity", "sweep", "sizes"):
+        assert np.array_equal(getattr(index, field), getattr(built, field))
+    assert index.sweep_path() == boustrophedon_path(grid)
+
+
+def test_stale_missing_or_old_sidecars_are_ignored(tmp_path, monkeypatch):
+    grid = create_sample_map()
+    map_path = str(tmp_path / "sample.npy")
+    assert load_for(grid, map_path) is None   # No sidecar yet
+    MapIndex.build(grid).save(sidecar_path(map_path))
+    grid.mark_visited(1, 1)
+    assert load_for(grid, map_path) is not None   # Visits don't change the layout
+    grid.add_obstacle(0, 5)
+    assert load_for(grid, map_path) is None
+    monkeypatch.setattr(map_index, "INDEX_VERSION", map_index.INDEX_VERSION + 1)
+    assert load_for(create_sample_map(), map_path) is None
+
+
+def test_planner_with_an_index_plans_the_same_mission():
+    grid = generate_map(30, seed=4, style="city", density=0.25)
+    index = MapIndex.build(grid)
+    plain = CoveragePlanner(generate_map(30, seed=4, style="city", density=0.25), verbose=False).plan()
+    assert CoveragePlanner(grid, verbose=False, index=index).plan() == plain
+    other = generate_map(30, seed=5, style="city", density=0.25)
+    with pytest.raises(ValueError):
+        CoveragePlanner(other, verbose=False, index=index)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_live_labels_stay_exact_as_cells_get_blocked(seed, monkeypatch):
+    grid = generate_map(25, seed=seed, style="scatter", density=0.25, no_fly=0.0)
+    connectivity = grid.connectivity()
+    relabels = []
+    relabel = map_index.Connectivity._relabel
+    monkeypatch.setattr(map_index.Connectivity, "_relabel",
+                        lambda self, label: relabels.append(label) or relabel(self, label))
+    rng = np.random.default_rng(seed)
+    free = list(zip(*np.nonzero(free_mask(grid))))
+    for i in rng.permutation(len(free))[:150]:
+        r, c = (int(v) for v in free[i])
+        if i % 2:
+            grid.add_dynamic_obstacle(r, c)
+        else:
+            grid.block_cell(r, c)
+        assert same_partition(connectivity.labels, label_components(free_mask(grid)))
+    assert len(relabels) < 150   # Cells that cannot split their component skip relabelling
+
+
+def test_sealed_off_goal_is_found_without_searching():
+    grid = create_sample_map()
+    for cell in ((18, 19), (19, 18), (18, 18)):
+        grid.add_obstacle(*cell)
+    d = DStarLite(grid, (0, 0), (19, 19), verbose=False, stats=SearchStats())
+    d.compute_shortest_path()
+    assert d.unreachable and not d.extract_path()
+    assert d.stats.pops == 0
+
+
+def test_planner_drops_waypoints_in_sealed_pockets():
+    grid = create_sample_map()
+    for cell in ((0, 18), (1, 18), (1, 19)):
+        grid.add_obstacle(*cell)
+    path = CoveragePlanner(grid, verbose=False).plan()
+    assert (0, 19) not in path
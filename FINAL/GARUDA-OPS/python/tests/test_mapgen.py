@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from grid import FREE, NO_FLY, OBSTACLE, START
+from mapgen import STYLES, generate_map, paint_rects, top_up
+
+
+def test_paint_rects_matches_naive_painting():
+    rng = np.random.default_rng(0)
+    r0, c0 = rng.integers(-5, 40, size=(2, 50))
+    r1, c1 = r0 + rng.integers(0, 12, size=50), c0 + rng.integers(0, 12, size=50)
+    mask = np.zeros((37, 41), dtype=bool)
+    paint_rects(mask, r0, c0, r1, c1)
+    expected = np.zeros_like(mask)
+    for a, b, c, d in zip(r0, c0, r1, c1):
+        expected[max(a, 0):max(c, 0), max(b, 0):max(d, 0)] = True
+    assert np.array_equal(mask, expected)
+
+
+def test_top_up_adds_exactly_enough_whole_shapes():
+    rng = np.random.default_rng(1)
+
+    def squares(n):
+        r, c = rng.integers(0, 60, size=(2, n))
+        return r, c, r + 3, c + 3
+
+    mask = np.zeros((60, 60), dtype=bool)
+    allowed = np.ones_like(mask)
+    allowed[:, :10] = False
+    top_up(mask, 500, squares, 9, allowed)
+    assert 500 <= mask.sum() < 500 + 9      # The last square may overshoot
+    assert not mask[:, :10].any()
+
+
+@pytest.mark.parametrize("size", [20, 64, 300])
+@pytest.mark.parametrize("density", [0.1, 0.3, 0.4])
+def test_city_density_and_no_fly_are_floors(size, density):
+    for seed in range(3):
+        cells = generate_map(size, seed=seed, style="city", density=density, no_fly=0.05).grid
+        assert (cells == OBSTACLE).mean() >= density
+        assert (cells == NO_FLY).mean() >= 0.05
+
+
+@pytest.mark.parametrize("style", STYLES)
+def test_seeded_maps_repeat_and_keep_corners_free(style):
+    a = generate_map(120, 90, seed=7, style=style)
+    b = generate_map(120, 90, seed=7, style=style)
+    assert np.array_equal(a.grid, b.grid)
+    assert a.grid.shape == (120, 90) and a.start == (0, 0) and a.grid[0, 0] == START
+    corner = a.grid[:3, :3].copy()
+    corner[0, 0] = FREE
+    assert not corner.any() and not a.grid[-3:, -3:].any()
+
+
+def test_unknown_style_is_rejected():
+    with pytest.raises(ValueError):
+        generate_map(10, style="forest")
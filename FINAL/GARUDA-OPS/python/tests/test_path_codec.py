@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+from path_codec import decode_path, encode_path, path_from_json, path_to_json
+
+
+def random_walk(n, seed, jumps=False):
+    rng = random.Random(seed)
+    moves = [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+    path = [(rng.randint(-50, 50), rng.randint(-50, 50))]
+    while len(path) < n:
+        if jumps and rng.random() < 0.05:
+            move = (rng.randint(-300, 300), rng.randint(-300, 300))
+        else:
+            move = rng.choice(moves)
+        for _ in range(rng.choice([1, 1, 2, 20, 40])):   # Short and long runs
+            path.append((path[-1][0] + move[0], path[-1][1] + move[1]))
+    return path[:n]
+
+
+@pytest.mark.parametrize("path", [
+    [],
+    [(0, 0)],
+    [(5, 7), (5, 7)],                          # Hover
+    [(0, 0), (0, 1), (10, 1), (-4000, 9000)],  # Jumps, negative and large coordinates
+    [(0, c) for c in range(1000)],             # One run longer than 15
+])
+def test_edge_cases_round_trip(path):
+    assert decode_path(encode_path(path)) == path
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_walks_round_trip(seed):
+    path = random_walk(2000, seed, jumps=seed % 2 == 1)
+    assert decode_path(encode_path(path)) == path
+
+
+def test_numpy_cells_encode_like_ints():
+    path = [(0, 0), (1, 1), (2, 2)]
+    assert encode_path([tuple(cell) for cell in np.array(path)]) == encode_path(path)
+
+
+def test_long_straight_paths_stay_small():
+    path = [(r, 0) for r in range(100_000)]
+    assert len(encode_path(path)) < 16
+
+
+def test_json_forms_round_trip():
+    path = random_walk(300, 7)
+    assert path_from_json(path_to_json(path)) == path
+    assert path_from_json(path_to_json(path, compact=False)) == path
+    with pytest.raises(ValueError):
+        path_from_json({"encoding": "rle0", "data": ""})
@@ -0,0 +1,46 @@
+import numpy as np
+
+import rl_agent
+from rl_agent import COLS, DroneMemory, ReplayBuffer, run_rl_missions
+
+
+def test_buffer_is_a_ring():
+    buf = ReplayBuffer(capacity=3)
+    for i in range(5):
+        buf.add((0, i), 1, float(i), (0, i + 1))
+    assert len(buf) == 3
+    assert sorted(buf.rewards.tolist()) == [2.0, 3.0, 4.0]   # Oldest two overwritten
+    buf.clear()
+    assert len(buf) == 0
+
+
+def test_seeded_sampling_is_reproducible():
+    batches = []
+    for _ in range(2):
+        buf = ReplayBuffer(capacity=100, seed=7)
+        for i in range(100):
+            buf.add((i // COLS, i % COLS), i % 4, float(i), (0, 0))
+        batches.append(buf.sample(16, prioritized=True)[0].tolist())
+    assert batches[0] == batches[1]
+
+
+def test_replay_update_moves_q_towards_target():
+    memory = DroneMemory(replay=True, seed=0)
+    memory.replay.add((1, 1), 2, 10.0, (1, 0))
+    memory.replay_update(batch_size=4)
+    assert 0 < memory.q[1, 1, 2] <= rl_agent.ALPHA * 10.0 + 1e-9
+    assert memory.q_seen[1, 1]
+
+
+def test_replay_is_opt_in():
+    assert DroneMemory().replay is None
+    assert DroneMemory().replay_update() == 0.0
+
+
+def test_seeded_training_is_reproducible(tmp_path):
+    runs = [run_rl_missions(num_missions=2, steps_per_mission=80, verbose=False, warm_start=False,
+                            early_stop=False, replay=True, seed=3,
+                            memory_file=str(tmp_path / f"memory{i}.json"))
+            for i in range(2)]
+    for name in runs[0]:
+        np.testing.assert_array_equal(runs[0][name], runs[1][name])
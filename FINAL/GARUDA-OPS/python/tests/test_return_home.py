@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from grid import NO_FLY, create_sample_map
+from mapgen import generate_map
+from planner import COST_STRAIGHT, COST_TURN, CoveragePlanner, ReturnField, cost_to_go
+
+
+def assert_field_exact(field, grid):
+    expected = cost_to_go(grid, [field.home]).ravel()
+    np.testing.assert_allclose(np.array(field.dist), expected, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repaired_field_matches_a_fresh_build(seed):
+    grid = generate_map(30, seed=seed, style="scatter", density=0.2, no_fly=0.0)
+    home = (0, 0)
+    grid.grid[home] = 0
+    field = ReturnField(grid, home)
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(grid.grid == 0)
+    for i in rng.permutation(len(free))[:60]:
+        r, c = (int(v) for v in free[i])
+        if (r, c) != home:
+            grid.block_cell(r, c)
+            assert_field_exact(field, grid)
+
+
+def test_blocking_home_or_a_no_fly_cell():
+    grid = create_sample_map()
+    field = ReturnField(grid, grid.start)
+    r, c = (int(v) for v in np.argwhere(grid.grid == NO_FLY)[0])
+    grid.block_cell(r, c)   # Neighbours lose their no-fly proximity penalty
+    assert_field_exact(field, grid)
+    grid.block_cell(*grid.start)
+    assert all(d == float("inf") for d in field.dist)
+
+
+def test_path_home_follows_the_field():
+    grid = create_sample_map()
+    field = ReturnField(grid, grid.start)
+    for cell in ((19, 19), (10, 5), (0, 12)):
+        path, energy = field.path_home(cell)
+        assert path[0] == cell and path[-1] == grid.start
+        assert all(grid.is_free(*p) for p in path)
+        assert field.cost(cell) <= energy <= field.cost(cell) * COST_TURN / COST_STRAIGHT + 1e-9
+
+
+@pytest.mark.parametrize("battery", [60.0, 150.0, 500.0])
+def test_return_home_missions_end_at_home_within_battery(battery):
+    grid = create_sample_map()
+    planner = CoveragePlanner(grid, battery=battery, verbose=False, return_home=True)
+    path = planner.plan()
+    stats = planner.stats()
+    assert stats["returned_home"] and path[-1] == grid.start
+    assert planner.battery >= 0
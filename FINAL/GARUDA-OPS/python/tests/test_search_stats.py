@@ -0,0 +1,61 @@
+import heapq
+
+import planner
+from dynamic_replanner import DynamicMission
+from grid import create_sample_map
+from planner import CoveragePlanner, astar
+from search_stats import SearchStats
+
+
+class CountingHeap:
+    """heapq stand-in counting the real heap operations"""
+
+    def __init__(self):
+        self.pushes = self.pops = 0
+
+    def heappush(self, heap, item):
+        self.pushes += 1
+        heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self.pops += 1
+        return heapq.heappop(heap)
+
+    def heapify(self, heap):
+        heapq.heapify(heap)
+
+
+def test_astar_counters_match_the_heap_and_leave_the_path_alone(monkeypatch):
+    grid = create_sample_map()
+    plain = astar(grid, (0, 0), (19, 19))
+    counting = CountingHeap()
+    monkeypatch.setattr(planner, "heapq", counting)
+    stats = SearchStats()
+    assert astar(grid, (0, 0), (19, 19), stats=stats) == plain
+    assert (stats.queries, stats.pushes, stats.pops) == (1, counting.pushes, counting.pops)
+    assert stats.expanded == stats.pops - 1   # The goal is popped, not expanded
+    assert 0 <= stats.stale_pops <= stats.pops
+    assert 0 < stats.max_open <= stats.pushes
+
+
+def test_merge_adds_totals_and_keeps_maxima():
+    a, b = SearchStats(), SearchStats()
+    a.queries, a.pops, a.max_open, a.max_seconds = 1, 10, 5, 0.5
+    b.queries, b.pops, b.max_open, b.max_seconds = 2, 4, 9, 0.1
+    a.merge(b)
+    assert (a.queries, a.pops, a.max_open, a.max_seconds) == (3, 14, 9, 0.5)
+
+
+def test_instrumented_missions_fly_the_same_and_report_counters():
+    plain = CoveragePlanner(create_sample_map(), verbose=False)
+    instrumented = CoveragePlanner(create_sample_map(), verbose=False, instrument=True)
+    assert instrumented.plan() == plain.plan()
+    assert "search" not in plain.stats()
+    assert instrumented.stats()["search"]["queries"] > 0
+
+    obstacles = {50: (3, 10), 120: (7, 14), 200: (15, 8)}
+    mission = DynamicMission(create_sample_map(), instrumented.full_path, 500.0, obstacles,
+                             verbose=False, instrument=True)
+    _, events = mission.run()
+    assert events and all("search" in event for event in events)
+    assert mission.search_stats.queries == sum(event["search"]["queries"] for event in events)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from grid import Grid, OBSTACLE, create_sample_map
+from line_of_sight import segment_cells, segment_clear
+from planner import astar
+from smoothing import path_energy, smooth_path
+
+
+def test_segment_touches_cells_met_at_a_corner():
+    seg, flat = segment_cells((0, 0), [(2, 2)], cols=3)
+    assert set(flat.tolist()) == {0, 1, 3, 4, 5, 7, 8}   # The diagonal and its corner neighbours
+
+
+def test_no_squeezing_between_diagonal_obstacles():
+    free = np.ones((3, 3), dtype=bool)
+    free[0, 1] = free[1, 0] = False
+    assert not segment_clear(free, (0, 0), [(1, 1)])[0]
+    assert segment_clear(free, (2, 0), [(2, 2)])[0]
+
+
+def test_smoothing_keeps_clearance_and_never_costs_more():
+    grid = create_sample_map()
+    goal = (grid.rows - 1, grid.cols - 1)
+    path, _ = astar(grid, grid.start, goal)
+    waypoints, before, after = smooth_path(grid, path)
+    assert waypoints[0] == path[0] and waypoints[-1] == goal
+    assert len(waypoints) < len(path) and after <= before
+    assert before == path_energy(grid, path) and after == path_energy(grid, waypoints)
+    free = np.isin(grid.grid, (0, 3, 4))
+    for a, b in zip(waypoints, waypoints[1:]):
+        assert segment_clear(free, a, [b])[0]
+
+
+def test_open_field_collapses_to_one_segment():
+    grid = Grid(10, 10)
+    grid.set_start(0, 0)
+    grid.add_obstacle(9, 0)
+    path, _ = astar(grid, (0, 0), (9, 9))
+    waypoints, _, _ = smooth_path(grid, path)
+    assert waypoints == [(0, 0), (9, 9)] and grid.grid[9, 0] == OBSTACLE
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+
+import stream_server
+from path_codec import path_from_json
+
+
+def sse_messages(text):
+    """(event name, data dict) for every SSE message"""
+    messages = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n")
+        messages.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return messages
+
+
+@pytest.fixture(scope="module")
+def client():
+    return stream_server.app.test_client()
+
+
+@pytest.fixture(scope="module")
+def messages(client):
+    response = client.get("/mission/stream")
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+    return sse_messages(response.get_data(as_text=True))
+
+
+def test_stream_sends_plan_then_flight(messages):
+    stages = [data["stage"] for _, data in messages]
+    assert stages[0] == "plan" and stages[-1] == "flight"
+    assert stages == sorted(stages, key=["plan", "flight"].index)   # No interleaving
+    assert all(name == data["type"] for name, data in messages)
+
+
+def test_stream_matches_the_one_shot_mission(client, messages):
+    whole = client.get("/mission/path").get_json()
+    flight = [data for _, data in messages if data["stage"] == "flight"]
+    assert flight[-1]["type"] == "done"
+    assert [data["position"] for data in flight if data["type"] == "step"] == whole["executed_path"]
+    assert sum(data["type"] == "replan" for data in flight) == whole["replannings"]
+
+
+def test_compact_paths_decode_to_the_plain_ones(client, messages):
+    compact = sse_messages(client.get("/mission/stream?paths=compact").get_data(as_text=True))
+    assert len(compact) == len(messages)
+    for (_, plain), (_, packed) in zip(messages, compact):
+        for field in stream_server.PATH_FIELDS:
+            if field in plain:
+                assert [list(cell) for cell in path_from_json(packed[field])] == plain[field]
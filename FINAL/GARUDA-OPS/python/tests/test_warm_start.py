@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from grid import create_sample_map
+from rl_agent import (ACTIONS, EPSILON_START, R_NO_FLY, R_OBSTACLE, DroneMemory,
+                      run_rl_missions)
+
+UP, DOWN, LEFT, RIGHT = range(4)
+
+
+def test_blocked_moves_get_the_blocked_rewards():
+    memory = DroneMemory()
+    memory.warm_start(create_sample_map())
+    assert memory.q[0, 0, UP] == R_OBSTACLE        # Off the map
+    assert memory.q[1, 5, DOWN] == R_OBSTACLE      # Into building cluster 1 at (2, 5)
+    assert memory.q[4, 10, DOWN] == R_NO_FLY       # Into no-fly zone A at (5, 10)
+
+
+def test_values_carry_distance_information():
+    memory = DroneMemory()
+    memory.warm_start(create_sample_map())
+    free = memory.q[memory.q > R_OBSTACLE]
+    assert len(np.unique(free)) > 10               # Not one constant prior
+    # Away from the start (0, 0) is towards the frontier
+    assert memory.q[0, 0, RIGHT] < 0 and memory.q[10, 0, DOWN] > memory.q[10, 0, UP]
+
+
+def test_learned_states_are_kept_and_epsilon_untouched():
+    memory = DroneMemory()
+    memory.set_q((3, 3), RIGHT, 7.0)
+    seeded = memory.warm_start(create_sample_map())
+    assert seeded == memory.q_seen.size - 1
+    assert memory.q[3, 3, RIGHT] == 7.0
+    assert memory.next_epsilon(1) == EPSILON_START
+
+
+def test_explicit_goal_is_the_best_direction():
+    memory = DroneMemory()
+    memory.warm_start(create_sample_map(), goals=[(0, 10)])
+    assert int(np.argmax(memory.q[0, 5])) == RIGHT
+    assert len(ACTIONS) == memory.q.shape[2]
+
+
+def test_epsilon_is_not_persisted(tmp_path):
+    path = tmp_path / "memory.json"
+    run_rl_missions(num_missions=1, steps_per_mission=20, verbose=False, early_stop=False,
+                    memory_file=str(path), seed=0)
+    assert "epsilon_start" not in json.loads(path.read_text())
@@ -1,16 +1,30 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, redirect, url_for
 from main import run_drone_simulation
+from jobs import JobQueue, QueueFull
 
 app = Flask(__name__)
+jobs = JobQueue(run_drone_simulation)
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
         start = (float(request.form["start_lat"]), float(request.form["start_lon"]))
         end = (float(request.form["end_lat"]), float(request.form["end_lon"]))
-        result = run_drone_simulation(start, end)
-        return render_template("result.html", result=result)
+        try:
+            job_id = jobs.submit(start, end)
+        except QueueFull:
+            return "Too many simulations running, please try again shortly.", 429, {"Retry-After": "5"}
+        return redirect(url_for("result", job_id=job_id))
     return render_template("index.html")
 
+@app.route("/result/<job_id>")
+def result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return redirect(url_for("index"))
+    if job["status"] == "done":
+        return render_template("result.html", result=job["result"])
+    return render_template("pending.html", job=job)
+
 if __name__ == "__main__":
     app.run(debug=True)
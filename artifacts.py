@@ -0,0 +1,58 @@
+import hashlib
+import os
+import time
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "sim")
+ARTIFACT_MAX_AGE = 3600     # Seconds a rendered image is kept after its last use
+CLEANUP_INTERVAL = 300      # Seconds between cleanup sweeps
+
+_last_cleanup = 0.0
+
+
+def save_png(data):
+    """
+    Store PNG bytes under a content-addressed name and return its path
+    relative to static/, e.g. "sim/3f2a9c0d1e4b5a67.png". Identical images
+    share one file, and concurrent writers never clobber each other.
+    """
+    name = hashlib.sha256(data).hexdigest()[:16] + ".png"
+    path = os.path.join(ARTIFACT_DIR, name)
+    if os.path.exists(path):
+        os.utime(path)  # Still in use, keep it out of cleanup
+    else:
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    maybe_cleanup()
+    return "sim/" + name
+
+
+def cleanup(max_age=ARTIFACT_MAX_AGE):
+    """
+    Delete rendered images not written or reused for max_age seconds.
+    """
+    if not os.path.isdir(ARTIFACT_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(ARTIFACT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # Removed by another worker
+    return removed
+
+
+def maybe_cleanup():
+    """
+    Run cleanup() at most once every CLEANUP_INTERVAL seconds.
+    """
+    global _last_cleanup
+    now = time.time()
+    if now - _last_cleanup >= CLEANUP_INTERVAL:
+        _last_cleanup = now
+        cleanup()
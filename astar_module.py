@@ -1,5 +1,8 @@
+from array import array
+import numpy as np
 import heapq
 from map import is_valid_cell
+from garuda_shared import line_of_sight
 
 def heuristic(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])  # Manhattan distance
@@ -31,3 +34,82 @@ def astar(grid, start, goal):
                     heapq.heappush(open_list, (f_score, neighbor))
                     came_from[neighbor] = current
     return None
+
+def astar_array(grid, start, goal):
+    """
+    Same search as astar() (moves, costs, heuristic) but over flat cell
+    indices with compact array-backed scores instead of dicts, so it scales
+    to grids with millions of cells. Returns a list of (row, col) or None.
+    """
+    rows, cols = grid.shape
+    free = (grid == 0).tobytes()
+    g_score = array('d', [float('inf')]) * (rows * cols)
+    came_from = array('l', [-1]) * (rows * cols)
+    goal_r, goal_c = goal
+    start_i = start[0] * cols + start[1]
+    goal_i = goal_r * cols + goal_c
+    moves = [(dx, dy, 1.4 if dx != 0 and dy != 0 else 1) for dx, dy in
+             [(0,1),(0,-1),(1,0),(-1,0),(1,1),(-1,-1),(1,-1),(-1,1)]]
+
+    g_score[start_i] = 0
+    open_list = [(0, start_i)]
+    while open_list:
+        _, current = heapq.heappop(open_list)
+
+        if current == goal_i:
+            path = []
+            while current != start_i:
+                path.append(divmod(current, cols))
+                current = came_from[current]
+            path.append(tuple(start))
+            return path[::-1]
+
+        x, y = divmod(current, cols)
+        g_current = g_score[current]
+        for dx, dy, cost in moves:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < rows and 0 <= ny < cols:
+                neighbor = nx * cols + ny
+                if free[neighbor]:
+                    tentative_g = g_current + cost
+                    if tentative_g < g_score[neighbor]:
+                        g_score[neighbor] = tentative_g
+                        came_from[neighbor] = current
+                        f_score = tentative_g + abs(nx - goal_r) + abs(ny - goal_c)
+                        heapq.heappush(open_list, (f_score, neighbor))
+    return None
+
+def segment_clear(grid, start, ends):
+    """
+    For each end cell: True if the straight line from the centre of start
+    to its centre only touches free cells (cells met at a corner included).
+    All segments are checked in one vectorised batch.
+    """
+    return line_of_sight.segment_clear(np.asarray(grid) == 0, start, ends)
+
+def path_cost(path):
+    """Energy fly() charges along a path: 1 per straight cell, 1.4 per diagonal one"""
+    points = np.asarray(path).reshape(-1, 2)
+    return float(line_of_sight.octile(points[:-1], points[1:]).sum())
+
+def smooth_path(grid, path):
+    """
+    Line-of-sight pruning of an astar() / astar_array() path
+    (line_of_sight.prune, the GARUDA smoother's loop): from each kept
+    waypoint, jump to the farthest later turn of the path that is in sight
+    and no longer to fly straight to. Returns (waypoints, energy_before,
+    energy_after) under path_cost().
+    """
+    path = [tuple(cell) for cell in path]
+    before = path_cost(path)
+    if len(path) < 3:
+        return path, before, before
+    free = np.asarray(grid) == 0
+    points = np.asarray(path)
+    spent = np.concatenate([[0.0], np.cumsum(line_of_sight.octile(points[:-1], points[1:]))])
+
+    def costs(i, cand):
+        return (line_of_sight.segment_clear(free, points[i], points[cand]),
+                line_of_sight.octile(points[i], points[cand]))
+    waypoints = [path[k] for k in line_of_sight.prune(points, spent, costs)]
+    return waypoints, before, path_cost(waypoints)
@@ -0,0 +1,66 @@
+"""
+bench_import_time.py - Server start-up import cost
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the total import time plus the heaviest top-level packages, so
+changes to the server import path can be compared.
+
+Run from the repo root:
+    python benchmarks/bench_import_time.py sever app --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def import_profile(module):
+    """
+    (total µs, {package: cumulative µs}) for one fresh import of module.
+    A package is charged where it is first entered from another package,
+    so e.g. matplotlib pulled in by main counts under matplotlib.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    # Children are printed before their parent, so walk the lines in
+    # reverse to see each parent first
+    packages, total, stack = {}, 0, []
+    for line in reversed(proc.stderr.splitlines()):
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        package = raw_name.strip().split(".")[0]
+        del stack[depth:]
+        if package == module and depth == 0:
+            total = int(cumulative)
+        elif not stack or stack[-1] != package:
+            packages[package] = packages.get(package, 0) + int(cumulative)
+        stack.append(package)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["sever", "app"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        totals = [total / 1000 for total, _ in runs]
+        print(f"import {module}: median {statistics.median(totals):.1f} ms "
+              f"(min {min(totals):.1f}, max {max(totals):.1f}, n={args.repeat})")
+        heaviest = sorted(runs[-1][1].items(), key=lambda kv: -kv[1])[:args.top]
+        for name, us in heaviest:
+            print(f"    {name:24s} {us/1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+bench_resolution.py - Simulation cost versus grid resolution
+Times map loading (cold and cached), planning + flight, and rendering of
+one seeded mission across resolutions, corner to corner.
+
+Run from the repo root:
+    python benchmarks/bench_resolution.py --sizes 10 100 500 1000 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main as sim
+
+
+def bench(resolution, seed=0):
+    sim.load_map.cache_clear()
+    t0 = time.perf_counter()
+    sim.load_map(sim.DEFAULT_BOUNDS, resolution)
+    t1 = time.perf_counter()
+    base_grid, _ = sim.load_map(sim.DEFAULT_BOUNDS, resolution)
+    t2 = time.perf_counter()
+
+    grid = base_grid.copy()
+    start, end = (0, 0), (resolution - 1, resolution - 1)
+    drone = sim.fly(grid, start, end, random.Random(seed))
+    t3 = time.perf_counter()
+    sim.render_path(grid, drone.path)
+    sim.render_heatmap(grid, drone.visited)
+    t4 = time.perf_counter()
+
+    return {
+        "planner": sim.planner_backend(resolution),
+        "map_cold": t1 - t0,
+        "map_cached": t2 - t1,
+        "fly": t3 - t2,
+        "render": t4 - t3,
+        "path_len": len(drone.path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000, 2000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Q-table files are written to the working directory; keep them out of the repo
+    os.chdir(tempfile.mkdtemp(prefix="bench_resolution_"))
+
+    print(f"{'size':>6} {'planner':>10} {'map cold':>10} {'map hit':>10} {'fly':>10} {'render':>10} {'path':>7}")
+    for size in args.sizes:
+        r = bench(size, seed=args.seed)
+        print(f"{size:>6} {r['planner']:>10} {r['map_cold']*1e3:>8.1f}ms {r['map_cached']*1e6:>8.1f}us "
+              f"{r['fly']*1e3:>8.1f}ms {r['render']*1e3:>8.1f}ms {r['path_len']:>7}")
+
+
+if __name__ == "__main__":
+    main()
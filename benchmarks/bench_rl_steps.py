@@ -0,0 +1,63 @@
+"""
+bench_rl_steps.py - Q-learning agent step throughput
+Times the choose_action() + step() loop of QLearningDrone on the sample map
+and reports steps/second.
+
+Run from the repo root:
+    python benchmarks/bench_rl_steps.py --steps 200000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FINAL", "GARUDA-OPS", "python"))
+
+from grid import create_sample_map
+from rl_agent import DroneMemory, QLearningDrone
+
+
+def bench(total_steps, epsilon=None, seed=0):
+    random.seed(seed)
+    memory = DroneMemory()
+    template = create_sample_map().grid
+    dynamic_obstacles = [(3,10), (7,14), (15,8), (11,5)]
+
+    done_steps, elapsed, mission = 0, 0.0, 1
+    while done_steps < total_steps:
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = QLearningDrone(template, memory, mission)
+        if epsilon is not None:
+            agent.epsilon = epsilon
+        schedule = {random.randint(50, 200): obs for obs in random.sample(dynamic_obstacles, k=2)}
+
+        t0 = time.perf_counter()
+        for step in range(min(400, total_steps - done_steps)):
+            action = agent.choose_action()
+            _, _, done, _ = agent.step(action, schedule.get(step))
+            done_steps += 1
+            if done:
+                break
+        elapsed += time.perf_counter() - t0
+        mission += 1
+
+    return done_steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for label, eps in [("explore (eps=1.0)", 1.0), ("exploit (eps=0.0)", 0.0), ("schedule", None)]:
+        rate = bench(args.steps, epsilon=eps, seed=args.seed)
+        print(f"{label:20s}: {rate:12,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+suite.py - Planner, replanner and RL benchmark suite
+Runs every search/training hot path on seeded random maps at several sizes
+and obstacle densities, and records wall time (best of --repeat), heap
+pops (node expansions, stale entries included), peak traced memory and
+throughput. Results are written as JSON so runs can be diffed; --compare
+flags cases that got slower than a baseline run. --maps adds procedural
+city/maze layouts (mapgen.py) next to the uniform random maps.
+
+Run from the repo root:
+    python benchmarks/suite.py --out bench.json
+    python benchmarks/suite.py --only astar dstar --sizes 20 100 --compare bench.json
+    python benchmarks/suite.py --only root_astar_array --maps city maze --sizes 2000
+"""
+
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+# GARUDA first: both trees have a top-level planner module
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "FINAL", "GARUDA-OPS", "python"))
+
+import astar_module
+import dynamic_replanner
+import mapgen
+import planner
+import rl_agent
+import smoothing
+from grid import Grid, FREE, OBSTACLE, NO_FLY, START
+
+DEFAULT_SIZES = [20, 50, 100, 200, 500, 2000]
+DEFAULT_DENSITIES = [0.1, 0.3]
+MAP_STYLES = ("random",) + mapgen.STYLES
+
+
+# ─────────────────────────────────────────
+# MAPS
+# ─────────────────────────────────────────
+def random_map(size, density, seed):
+    """
+    Seeded size x size Grid: obstacles at `density`, a quarter of them no-fly.
+    The 3x3 corners around the start (0,0) and the goal (far corner) are
+    kept free so neither is trivially walled in.
+    """
+    rng = np.random.default_rng(seed)
+    g = Grid(size, size)
+    cells = rng.random((size, size))
+    g.grid[cells < density] = OBSTACLE
+    g.grid[cells < density / 4] = NO_FLY
+    g.grid[:3, :3] = FREE
+    g.grid[-3:, -3:] = FREE
+    g.set_start(0, 0)
+    return g
+
+
+def make_map(style, size, density, seed):
+    """random_map() for "random", otherwise a mapgen layout (same corner guarantees)"""
+    if style == "random":
+        return random_map(size, density, seed)
+    return mapgen.generate_map(size, seed=seed, style=style, density=density, no_fly=density / 4)
+
+
+def root_grid(g):
+    """The same map in the root app's format: 0 = free, 1 = blocked"""
+    return (~np.isin(g.grid, (FREE, START))).astype(int)
+
+
+# ─────────────────────────────────────────
+# MEASUREMENT
+# ─────────────────────────────────────────
+class CountingHeap:
+    """Stand-in for the heapq module that counts pushes and pops"""
+
+    def __init__(self):
+        self.pushes = self.pops = 0
+
+    def heappush(self, heap, item):
+        self.pushes += 1
+        heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self.pops += 1
+        return heapq.heappop(heap)
+
+    def heapify(self, heap):
+        heapq.heapify(heap)
+
+
+@contextlib.contextmanager
+def counting_heap(*modules):
+    counter = CountingHeap()
+    for module in modules:
+        module.heapq = counter
+    try:
+        yield counter
+    finally:
+        for module in modules:
+            module.heapq = heapq
+
+
+def measure(run, repeat, modules=()):
+    """
+    run(): prepares fresh state and returns (timed_fn, info_fn). timed_fn is
+    timed alone; info_fn(result) returns extra fields for the record.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        fn, info = run()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    # Counts and peak memory come from one extra, slower traced run
+    fn, info = run()
+    with counting_heap(*modules) as counter:
+        tracemalloc.start()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": best, "heap_pops": counter.pops, "heap_pushes": counter.pushes,
+            "peak_kib": round(peak / 1024, 1), **info(result)}
+
+
+# ─────────────────────────────────────────
+# CASES
+# ─────────────────────────────────────────
+def case_planner_astar(size, density, seed, repeat, style):
+    g = make_map(style, size, density, seed)
+    goal = (size - 1, size - 1)
+    return measure(lambda: (lambda: planner.astar(g, g.start, goal),
+                            lambda r: {"found": bool(r[0]), "path_len": len(r[0])}),
+                   repeat, [planner])
+
+
+def case_coverage_plan(size, density, seed, repeat, style):
+    def run():
+        p = planner.CoveragePlanner(make_map(style, size, density, seed), battery=float("inf"),
+                                    verbose=False)
+        return p.plan, lambda r: {"path_len": len(r), "waypoints": p.waypoints_visited}
+    return measure(run, repeat, [planner])
+
+
+def case_dstar_compute(size, density, seed, repeat, style):
+    g = make_map(style, size, density, seed)
+    goal = (size - 1, size - 1)
+
+    def run():
+        d = dynamic_replanner.DStarLite(g, g.start, goal, verbose=False)
+        return (lambda: (d.compute_shortest_path(), d.extract_path())[1],
+                lambda r: {"found": bool(r), "path_len": len(r)})
+    return measure(run, repeat, [dynamic_replanner])
+
+
+def case_dstar_notify(size, density, seed, repeat, style):
+    goal = (size - 1, size - 1)
+
+    def run():
+        g = make_map(style, size, density, seed)
+        d = dynamic_replanner.DStarLite(g, g.start, goal, verbose=False)
+        d.compute_shortest_path()
+        path = d.extract_path()
+        blocked = path[len(path) // 2] if len(path) > 2 else goal
+        return (lambda: (d.notify_obstacle(blocked), d.extract_path())[1],
+                lambda r: {"found": bool(r), "path_len": len(r), "obstacle": list(blocked)})
+    return measure(run, repeat, [dynamic_replanner])
+
+
+def case_root_astar(size, density, seed, repeat, style):
+    grid = root_grid(make_map(style, size, density, seed))
+    goal = (size - 1, size - 1)
+    return measure(lambda: (lambda: astar_module.astar(grid, (0, 0), goal),
+                            lambda r: {"found": r is not None, "path_len": len(r or [])}),
+                   repeat, [astar_module])
+
+
+def case_root_astar_array(size, density, seed, repeat, style):
+    grid = root_grid(make_map(style, size, density, seed))
+    goal = (size - 1, size - 1)
+    return measure(lambda: (lambda: astar_module.astar_array(grid, (0, 0), goal),
+                            lambda r: {"found": r is not None, "path_len": len(r or [])}),
+                   repeat, [astar_module])
+
+
+def case_smooth(size, density, seed, repeat, style):
+    """smoothing.smooth_path() on the planner.astar path to the far corner"""
+    g = make_map(style, size, density, seed)
+    path, _ = planner.astar(g, g.start, (size - 1, size - 1))
+    return measure(lambda: (lambda: smoothing.smooth_path(g, path),
+                            lambda r: {"path_len": len(path), "waypoints": len(r[0]),
+                                       "energy_before": round(r[1], 2),
+                                       "energy_after": round(r[2], 2)}),
+                   repeat)
+
+
+def case_root_smooth(size, density, seed, repeat, style):
+    grid = root_grid(make_map(style, size, density, seed))
+    path = astar_module.astar_array(grid, (0, 0), (size - 1, size - 1)) or [(0, 0)]
+    return measure(lambda: (lambda: astar_module.smooth_path(grid, path),
+                            lambda r: {"path_len": len(path), "waypoints": len(r[0]),
+                                       "energy_before": round(r[1], 2),
+                                       "energy_after": round(r[2], 2)}),
+                   repeat)
+
+
+def case_rl_steps(size, density, seed, repeat, style, steps=20000):
+    """QLearningDrone.step() throughput; the agent's map is fixed at ROWS x COLS"""
+    template = make_map(style, rl_agent.ROWS, density, seed).grid
+
+    def run():
+        random.seed(seed)
+        memory = rl_agent.DroneMemory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = rl_agent.QLearningDrone(template, memory, 1, verbose=False, epsilon=0.3)
+
+        def fly():
+            for _ in range(steps):
+                agent.step(agent.choose_action())
+            return steps
+        return fly, lambda r: {}
+
+    result = measure(run, repeat)
+    result["steps_per_s"] = round(steps / result["seconds"])
+    return result
+
+
+# name -> (function, largest size it is run at by default; --all-sizes lifts it)
+CASES = {
+    "astar":            (case_planner_astar, 200),
+    "coverage":         (case_coverage_plan, 100),  # One A* per waypoint, so ~size^2 searches
+    "dstar":            (case_dstar_compute, 200),
+    "dstar_notify":     (case_dstar_notify, 500),
+    "root_astar":       (case_root_astar, 2000),
+    "root_astar_array": (case_root_astar_array, 2000),
+    "smooth":           (case_smooth, 200),   # Includes one untimed A* to get the path
+    "root_smooth":      (case_root_smooth, 2000),
+    "rl_steps":         (case_rl_steps, 20),
+}
+
+
+# ─────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────
+def run_suite(names, sizes, densities, seed, repeat, all_sizes=False, log=print,
+              styles=("random",)):
+    results = []
+    for name in names:
+        fn, max_size = CASES[name]
+        for style in styles:
+            for size in sizes:
+                if name == "rl_steps":
+                    size = rl_agent.ROWS
+                elif size > max_size and not all_sizes:
+                    continue
+                for density in densities:
+                    if any(r["case"] == name and r["map"] == style and r["size"] == size
+                           and r["density"] == density for r in results):
+                        continue
+                    record = {"case": name, "map": style, "size": size, "density": density,
+                              "seed": seed, **fn(size, density, seed, repeat, style)}
+                    results.append(record)
+                    log(f"{name:18s} {style:8s} {size:>5}  d={density:<4} "
+                        f"{record['seconds']*1000:10.2f} ms  pops={record['heap_pops']:<9} "
+                        f"peak={record['peak_kib']:>10} KiB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Cases more than `tolerance` slower than the baseline"""
+    # Runs from before --maps existed only have random maps
+    key = lambda r: (r["case"], r.get("map", "random"), r["size"], r["density"], r["seed"])
+    old = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        before = old.get(key(r))
+        if before and r["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append({"case": r["case"], "map": r["map"], "size": r["size"],
+                                "density": r["density"], "before": before["seconds"],
+                                "after": r["seconds"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("--maps", nargs="+", choices=MAP_STYLES, default=["random"],
+                        help="map layouts to run every case on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--all-sizes", action="store_true",
+                        help="also run cases above their default size cap")
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown fraction reported as a regression")
+    args = parser.parse_args()
+
+    log = lambda line: print(line, file=sys.stderr)
+    results = run_suite(args.only, args.sizes, args.densities, args.seed, args.repeat,
+                        args.all_sizes, log, args.maps)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for r in report["regressions"]:
+            log(f"⚠️  {r['case']} {r['map']} {r['size']} d={r['density']}: "
+                f"{r['before']*1000:.2f} → {r['after']*1000:.2f} ms")
+        exit_code = 1 if report["regressions"] else 0
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
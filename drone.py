@@ -1,25 +1,30 @@
+from garuda_shared import CellPath, CellSet
+
 class Drone:
-    def __init__(self, start=(0, 0), energy=100):
+    __slots__ = ("position", "energy", "path", "visited")
+
+    def __init__(self, start=(0, 0), energy=100, shape=(10, 10)):
         """
         Initialize the drone with a starting position and energy level.
+        shape: (rows, cols) of the grid it flies over (default: map.create_grid())
         """
         self.position = start
         self.energy = energy
-        self.path = [start]
-        self.visited = set([start])
+        self.path = CellPath(shape, [start])
+        self.visited = CellSet(shape, [start])
 
     def move(self, new_pos, cost=1):
         """
         Move the drone to a new position and update energy and path.
+        Returns False (and stays put) if there is not enough energy.
         """
         if self.energy < cost:
-            print("Not enough energy to move!")
             return False
 
+        self.visited.add(new_pos)  # First: raises IndexError off the grid
         self.position = new_pos
         self.energy -= cost
         self.path.append(new_pos)
-        self.visited.add(new_pos)
         return True
 
     def status(self):
@@ -38,5 +43,5 @@ if __name__ == "__main__":
         if success:
             print(f"Moved to {move}")
         else:
-            print("Move failed.")
+            print("Not enough energy to move! Move failed.")
         drone.status()
@@ -0,0 +1,16 @@
+"""
+Code the root app shares with the GARUDA backend (FINAL/GARUDA-OPS/python)
+instead of keeping its own copy: the line-of-sight geometry behind path
+smoothing and the compact CellPath / CellSet containers. That directory is
+appended to sys.path, so our own modules win where the two trees share a
+name (planner, main).
+"""
+import os
+import sys
+
+GARUDA_PYTHON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "FINAL", "GARUDA-OPS", "python")
+if GARUDA_PYTHON not in sys.path:
+    sys.path.append(GARUDA_PYTHON)
+
+import line_of_sight
+from cells import CellPath, CellSet
@@ -1,5 +1,4 @@
 import pygame
-import time
 
 CELL_SIZE = 50
 MARGIN = 2
@@ -10,49 +9,132 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 GREY = (200, 200, 200)
 
-def draw_grid(screen, grid, drone):
-    screen.fill(WHITE)
-    for row in range(len(grid)):
-        for col in range(len(grid[0])):
-            color = WHITE
+STEPS_PER_SECOND = 5   # Simulation speed (one step used to take a fixed 0.2 s)
+FPS = 30               # Redraw rate, independent of the simulation speed
+HOLD_SECONDS = 2       # Keep the final frame on screen this long
+
+def cell_rect(row, col):
+    return pygame.Rect((MARGIN + CELL_SIZE) * col + MARGIN,
+                       (MARGIN + CELL_SIZE) * row + MARGIN,
+                       CELL_SIZE, CELL_SIZE)
+
+def draw_background(grid):
+    """
+    Pre-render the static map: free cells white, obstacles black.
+    """
+    rows, cols = len(grid), len(grid[0])
+    surface = pygame.Surface((cols * (CELL_SIZE + MARGIN) + MARGIN,
+                              rows * (CELL_SIZE + MARGIN) + MARGIN))
+    surface.fill(WHITE)
+    for row in range(rows):
+        for col in range(cols):
             if grid[row][col] == 1:
-                color = BLACK
-            elif (row, col) in drone.visited:
-                color = GREY
-            pygame.draw.rect(screen, color,
-                [(MARGIN + CELL_SIZE) * col + MARGIN,
-                 (MARGIN + CELL_SIZE) * row + MARGIN,
-                 CELL_SIZE, CELL_SIZE])
-    # Draw drone
-    x, y = drone.position
-    pygame.draw.rect(screen, BLUE,
-        [(MARGIN + CELL_SIZE) * y + MARGIN,
-         (MARGIN + CELL_SIZE) * x + MARGIN,
-         CELL_SIZE, CELL_SIZE])
-    pygame.display.flip()
-
-def run_simulation(grid, drone, path):
+                pygame.draw.rect(surface, BLACK, cell_rect(row, col))
+    return surface.convert() if pygame.display.get_surface() else surface
+
+class GridView:
+    def __init__(self, screen, grid):
+        """
+        Incremental renderer: the static map is drawn once into a background
+        surface, then only cells that change are repainted and pushed to the
+        display with display.update(rects).
+        """
+        self.screen = screen
+        self.grid = grid
+        self.background = draw_background(grid)
+        self.dirty = []
+        self.drone_cell = None
+
+    def redraw(self, drone):
+        """
+        Paint the whole frame (first frame, or after the window was exposed).
+        """
+        self.screen.blit(self.background, (0, 0))
+        for row, col in drone.visited:
+            if self.grid[row][col] != 1:
+                pygame.draw.rect(self.screen, GREY, cell_rect(row, col))
+        self.drone_cell = None
+        self.move_drone(drone)
+        self.dirty = []
+        pygame.display.flip()
+
+    def update_cell(self, row, col, drone):
+        """
+        Repaint one cell from the current state, e.g. after the grid changed.
+        """
+        color = WHITE
+        if self.grid[row][col] == 1:
+            color = BLACK
+        elif (row, col) in drone.visited:
+            color = GREY
+        rect = cell_rect(row, col)
+        pygame.draw.rect(self.screen, color, rect)
+        self.dirty.append(rect)
+
+    def move_drone(self, drone):
+        if self.drone_cell is not None:
+            self.update_cell(*self.drone_cell, drone)
+        self.drone_cell = drone.position
+        rect = cell_rect(*drone.position)
+        pygame.draw.rect(self.screen, BLUE, rect)
+        self.dirty.append(rect)
+
+    def present(self):
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+def draw_grid(screen, grid, drone):
+    GridView(screen, grid).redraw(drone)
+
+def run_simulation(grid, drone, path, steps_per_second=STEPS_PER_SECOND, fps=FPS):
+    """
+    Animate the drone flying path. The simulation advances at
+    steps_per_second while the window is redrawn at most fps times a
+    second, so fast simulations batch several steps into one frame.
+    """
     pygame.init()
     width = len(grid[0]) * (CELL_SIZE + MARGIN) + MARGIN
     height = len(grid) * (CELL_SIZE + MARGIN) + MARGIN
     screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("Drone Path Animation")
 
-    running = True
-    for step in path:
+    view = GridView(screen, grid)
+    view.redraw(drone)
+    clock = pygame.time.Clock()
+    steps = iter(path)
+    due = 0.0  # Simulation steps owed since the last frame
+
+    running, closed = True, False
+    while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                running, closed = False, True
+            elif event.type == pygame.VIDEOEXPOSE:
+                view.redraw(drone)
+
+        due += clock.get_time() / 1000 * steps_per_second
+        while running and due >= 1:
+            due -= 1
+            step = next(steps, None)
+            if step is None:
+                running = False
+                break
+            dx = abs(step[0] - drone.position[0])
+            dy = abs(step[1] - drone.position[1])
+            cost = 1.4 if dx == 1 and dy == 1 else 1
+            if not drone.move(step, cost):
+                print("Drone ran out of energy!")
                 running = False
+                break
+            view.move_drone(drone)
 
-        dx = abs(step[0] - drone.position[0])
-        dy = abs(step[1] - drone.position[1])
-        cost = 1.4 if dx == 1 and dy == 1 else 1
-        moved = drone.move(step, cost)
-        draw_grid(screen, grid, drone)
-        time.sleep(0.2)
-        if not moved:
-            print("Drone ran out of energy!")
-            break
+        view.present()
+        clock.tick(fps)
 
-    time.sleep(2)
+    hold_until = pygame.time.get_ticks() + HOLD_SECONDS * 1000
+    while not closed and pygame.time.get_ticks() < hold_until:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        clock.tick(fps)
     pygame.quit()
@@ -0,0 +1,48 @@
+import threading
+import numpy as np
+
+
+def visit_counts(path, shape):
+    """
+    Times each cell appears in path, as a (rows, cols) uint32 array. One
+    bincount over flat cell indices instead of a Python loop per cell.
+    """
+    rows, cols = shape
+    if len(path) == 0:
+        return np.zeros(shape, dtype=np.uint32)
+    cells = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    flat = cells[:, 0] * cols + cells[:, 1]
+    return np.bincount(flat, minlength=rows * cols).astype(np.uint32).reshape(shape)
+
+
+class VisitHeatmap:
+    def __init__(self, shape):
+        """
+        Visit counts summed over many missions on one map. Accumulation is
+        just an array add; rendering reads a snapshot whenever it is needed.
+        """
+        self.counts = np.zeros(shape, dtype=np.uint32)
+        self.missions = 0
+        self.lock = threading.Lock()
+
+    def add(self, path):
+        counts = visit_counts(path, self.counts.shape)
+        with self.lock:
+            self.counts += counts
+            self.missions += 1
+
+    def snapshot(self):
+        with self.lock:
+            return self.counts.copy(), self.missions
+
+    def save(self, file):
+        counts, missions = self.snapshot()
+        np.savez_compressed(file, counts=counts, missions=missions)
+
+    @classmethod
+    def load(cls, file):
+        with np.load(file) as data:
+            heatmap = cls(data["counts"].shape)
+            heatmap.counts[:] = data["counts"]
+            heatmap.missions = int(data["missions"])
+        return heatmap
@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+import uuid
+
+MAX_WORKERS = 2      # Simulations running at the same time
+MAX_QUEUED = 32      # Jobs waiting for a worker before we push back (429)
+RESULT_TTL = 600     # Seconds a finished job is kept for polling
+
+
+class QueueFull(Exception):
+    """
+    Raised by JobQueue.submit when no more jobs can be accepted.
+    """
+
+
+class JobQueue:
+    def __init__(self, func, workers=MAX_WORKERS, max_queued=MAX_QUEUED, result_ttl=RESULT_TTL):
+        """
+        Run func(*args) for submitted jobs on a pool of worker threads.
+        The waiting queue is bounded so callers get backpressure instead of
+        an ever-growing backlog.
+        """
+        self.func = func
+        self.result_ttl = result_ttl
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)  # Notified whenever a job ends
+        self.submit_lock = threading.Lock()  # Keeps submit_many's free-slot check valid
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, *args):
+        """
+        Queue a job and return its id immediately. Raises QueueFull when
+        the waiting queue is at capacity.
+        """
+        return self.submit_many([args])[0]
+
+    def submit_many(self, args_list):
+        """
+        Queue one job per args tuple, all or none: returns their ids, or
+        raises QueueFull (queueing nothing) if they don't all fit.
+        """
+        job_ids = [uuid.uuid4().hex for _ in args_list]
+        with self.submit_lock:
+            # Workers only ever take jobs off the queue, so the free slots can't shrink here
+            if self.pending.maxsize - self.pending.qsize() < len(args_list):
+                raise QueueFull(f"no room for {len(args_list)} more simulations "
+                                f"({self.pending.maxsize} may be queued)")
+            with self.lock:
+                self._prune()
+                for job_id in job_ids:
+                    self.jobs[job_id] = {
+                        "id": job_id,
+                        "status": "queued",
+                        "result": None,
+                        "error": None,
+                        "submitted_at": time.time(),
+                        "finished_at": None,
+                    }
+            for job_id, args in zip(job_ids, args_list):
+                self.pending.put_nowait((job_id, args))
+        return job_ids
+
+    def get(self, job_id):
+        """
+        Return a snapshot of the job (status, result, error), or None.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def as_completed(self, job_ids):
+        """
+        Yield a snapshot of each job as it finishes (done or failed), in
+        completion order. Unknown ids are skipped.
+        """
+        waiting = set(job_ids)
+        while waiting:
+            with self.finished:
+                while True:
+                    waiting = {job_id for job_id in waiting if job_id in self.jobs}
+                    ended = [dict(self.jobs[job_id]) for job_id in waiting
+                             if self.jobs[job_id]["finished_at"] is not None]
+                    if ended or not waiting:
+                        break
+                    self.finished.wait()
+            for job in ended:
+                waiting.discard(job["id"])
+                yield job
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+            if fields.get("finished_at") is not None:
+                self.finished.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["finished_at"] is not None and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job_id, args = self.pending.get()
+            self._update(job_id, status="running")
+            try:
+                result = self.func(*args)
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            else:
+                self._update(job_id, status="done", result=result, finished_at=time.time())
+            finally:
+                self.pending.task_done()
@@ -1,28 +1,230 @@
-import matplotlib.pyplot as plt
+import functools
+import hashlib
+import io
+import threading
 import numpy as np
 import random
-from map import create_grid, print_grid
+from map import create_scaled_grid
 from drone import Drone
-from q_learning import QLearningPlanner
-from gui import run_simulation
+from q_learning import QLearningPlanner, shared_store
+from astar_module import astar_array
+from artifacts import save_png
+from cache import ResultCache
+from heatmap import VisitHeatmap, visit_counts
+
+LAT_MIN, LAT_MAX = 28.40, 28.90
+LON_MIN, LON_MAX = 76.80, 77.40
+DEFAULT_BOUNDS = (LAT_MIN, LAT_MAX, LON_MIN, LON_MAX)
+GRID_SIZE = 10            # Default resolution (cells per side)
+MAX_GRID_SIZE = 2000
+QLEARNING_MAX_SIZE = 32   # Above this the Q-table is too sparse to help; use A*
+MAP_CACHE_SIZE = 8        # Precomputed maps kept per (bounds, resolution)
+PLANNER_PARAMS = {"alpha": 0.1, "gamma": 0.9, "epsilon": 0.1, "energy": 50}
+
+RESULT_CACHE = ResultCache()
+HEATMAPS = {}  # map version -> VisitHeatmap summed over every mission flown on it
+HEATMAPS_LOCK = threading.Lock()
 
 def latlon_to_grid(lat, lon, lat_min, lat_max, lon_min, lon_max, grid_size):
     row = int((lat_max - lat) / (lat_max - lat_min) * (grid_size - 1))
     col = int((lon - lon_min) / (lon_max - lon_min) * (grid_size - 1))
     return (row, col)
 
-def run_drone_simulation(start_coords, end_coords):
-    lat_min, lat_max = 28.40, 28.90
-    lon_min, lon_max = 76.80, 77.40
-    grid_size = 10
+def figure_png(fig):
+    """
+    Encode a Figure as PNG bytes. Figures built with the object-oriented
+    API hold no pyplot global state, so threads can render concurrently.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+def render_path(grid, path):
+    from matplotlib.figure import Figure  # Deferred: only needed once we render
+    fig = Figure()
+    ax = fig.subplots()
+    x, y = zip(*path)
+    ax.imshow(grid, cmap='Greys')
+    ax.plot(y, x, marker='o', color='blue', linewidth=2)
+    ax.scatter(y[0], x[0], color='green', label='Start')
+    ax.scatter(y[-1], x[-1], color='red', label='End')
+    ax.set_title("🚁 Drone Path")
+    ax.legend()
+    ax.invert_yaxis()
+    return figure_png(fig)
+
+def render_heatmap(counts, title="🔥 Coverage Heatmap"):
+    from matplotlib.figure import Figure
+    fig = Figure()
+    ax = fig.subplots()
+    im = ax.imshow(counts, cmap='YlOrRd')
+    ax.set_title(title)
+    fig.colorbar(im, ax=ax, label='Visits')
+    ax.invert_yaxis()
+    return figure_png(fig)
+
+def map_version(grid):
+    """
+    Short hash identifying the map layout; changes whenever the map does.
+    """
+    h = hashlib.sha1(str(grid.shape).encode())
+    h.update(np.ascontiguousarray(grid).tobytes())
+    return h.hexdigest()[:12]
+
+@functools.lru_cache(maxsize=MAP_CACHE_SIZE)
+def load_map(bounds, resolution):
+    """
+    Precomputed (grid, version) for a (bounds, resolution) pair. The grid is
+    read-only and shared between requests; simulations work on a copy.
+    Obstacles are the sample layout scaled to the resolution.
+    """
+    grid = create_scaled_grid(resolution, resolution)
+    grid.setflags(write=False)
+    return grid, map_version(grid)
+
+def mission_heatmap(version, shape):
+    with HEATMAPS_LOCK:
+        if version not in HEATMAPS:
+            HEATMAPS[version] = VisitHeatmap(shape)
+        return HEATMAPS[version]
+
+def aggregate_heatmap(bounds=DEFAULT_BOUNDS, resolution=GRID_SIZE):
+    """
+    Render the visit density of every mission flown on this map so far.
+    Returns (static path of the PNG, missions counted, max visits of a cell).
+    """
+    base_grid, version = load_map(tuple(bounds), resolution)
+    counts, missions = mission_heatmap(version, base_grid.shape).snapshot()
+    png = render_heatmap(counts, f"🔥 Visit Density ({missions} missions)")
+    return save_png(png), missions, int(counts.max())
+
+def reload_maps():
+    """
+    Drop the precomputed maps (e.g. after the map data changed) together
+    with every result and heatmap accumulated on them.
+    """
+    load_map.cache_clear()
+    RESULT_CACHE.clear()
+    with HEATMAPS_LOCK:
+        HEATMAPS.clear()
+
+def planner_backend(resolution):
+    return "qlearning" if resolution <= QLEARNING_MAX_SIZE else "astar"
+
+def check_area(bounds, resolution):
+    lat_min, lat_max, lon_min, lon_max = bounds
+    if not (lat_min < lat_max and lon_min < lon_max):
+        raise ValueError(f"invalid bounds {bounds}: expected (lat_min, lat_max, lon_min, lon_max)")
+    if not 2 <= resolution <= MAX_GRID_SIZE:
+        raise ValueError(f"resolution must be between 2 and {MAX_GRID_SIZE}, got {resolution}")
+
+def coords_to_cell(coords, bounds=DEFAULT_BOUNDS, resolution=GRID_SIZE):
+    row, col = latlon_to_grid(*coords, *bounds, resolution)
+    return (min(max(row, 0), resolution - 1), min(max(col, 0), resolution - 1))
+
+def run_drone_simulation(start_coords, end_coords, seed=None, resolution=GRID_SIZE, bounds=DEFAULT_BOUNDS):
+    """
+    Plan and fly a mission between two lat/lon points on a resolution x
+    resolution grid over bounds = (lat_min, lat_max, lon_min, lon_max).
+    Small grids use the Q-learning planner, larger ones array-backed A*.
+
+    With a seed the run is deterministic: obstacle spawns and exploration
+    use random.Random(seed), and the Q-learning planner reads a frozen
+    snapshot of the Q-table without training it. Its result is cached per
+    (map version, start cell, end cell, planner params, seed, Q-table
+    version). Unseeded runs are random, train the Q-table and are always
+    recomputed.
+    """
+    bounds = tuple(bounds)
+    check_area(bounds, resolution)
+    return run_cell_simulation(coords_to_cell(start_coords, bounds, resolution),
+                               coords_to_cell(end_coords, bounds, resolution),
+                               seed, resolution, bounds)
+
+def run_cell_simulation(start, end, seed=None, resolution=GRID_SIZE, bounds=DEFAULT_BOUNDS):
+    """
+    run_drone_simulation for (row, col) cells that are already quantized.
+    """
+    base_grid, version = load_map(tuple(bounds), resolution)
+    grid = base_grid.copy()
+
+    heatmap = mission_heatmap(version, base_grid.shape)
+
+    if seed is None:
+        result, path_png, heatmap_png = simulate(grid, start, end, random, heatmap)
+    else:
+        store = None  # A* needs no Q-table
+        if planner_backend(resolution) == "qlearning":
+            store = shared_store(q_table_file(resolution)).snapshot()
+        key = (version, start, end, tuple(sorted(PLANNER_PARAMS.items())), seed,
+               store and store.version)
+        cached = RESULT_CACHE.get(key)
+        if cached is None:
+            cached = simulate(grid, start, end, random.Random(seed), heatmap, store)
+            RESULT_CACHE.put(key, cached)
+        result, path_png, heatmap_png = cached
+
+    return {
+        **result,
+        "path_image": save_png(path_png),
+        "heatmap_image": save_png(heatmap_png),
+    }
+
+def simulate(grid, start, end, rng, heatmap=None, store=None):
+    """
+    Run one mission on grid (mutated in place) and render it, adding its
+    path to heatmap (a VisitHeatmap) if given. store: Q-table the planner
+    uses (default: the shared one for this grid size).
+    Returns (result dict, path PNG bytes, heatmap PNG bytes).
+    """
+    drone = fly(grid, start, end, rng, store)
+    if heatmap is not None:
+        heatmap.add(drone.path)
+    total_free_cells = grid.size - np.count_nonzero(grid)
+    coverage = len(drone.visited) / total_free_cells if total_free_cells > 0 else 0
+
+    result = {
+        "energy": round(drone.energy, 2),
+        "coverage": round(coverage * 100, 2),
+        "goal_reached": end in drone.visited,
+        "planner": planner_backend(len(grid)),
+    }
+    return result, render_path(grid, drone.path), render_heatmap(visit_counts(drone.path, grid.shape))
+
+def fly(grid, start, end, rng, store=None):
+    """
+    Plan a route with the backend for this grid size, then fly it while
+    obstacles randomly appear. Returns the Drone.
+    """
+    size = len(grid)
+    # Energy scales with resolution so a crossing costs the same share of battery
+    drone = Drone(start=start, energy=PLANNER_PARAMS["energy"] * size / GRID_SIZE, shape=grid.shape)
+    if planner_backend(size) == "astar":
+        path = astar_array(grid, start, end) or [start]
+    else:
+        path = plan_qlearning(grid, start, end, rng, store)
+
+    for step in path[1:]:
+        dx = abs(step[0] - drone.position[0])
+        dy = abs(step[1] - drone.position[1])
+        cost = 1.4 if dx == 1 and dy == 1 else 1
+        moved = drone.move(step, cost)
+        if rng.random() < 0.2:
+            ox, oy = rng.randint(0, size - 1), rng.randint(0, size - 1)
+            if grid[ox][oy] == 0 and (ox, oy) not in drone.visited:
+                grid[ox][oy] = 1
+        if not moved:
+            break
+    return drone
 
-    start = latlon_to_grid(*start_coords, lat_min, lat_max, lon_min, lon_max, grid_size)
-    end = latlon_to_grid(*end_coords, lat_min, lat_max, lon_min, lon_max, grid_size)
+def q_table_file(size):
+    return "q_table.json" if size == GRID_SIZE else f"q_table_{size}.json"
 
-    grid = create_grid()
-    drone = Drone(start=start, energy=50)
-    planner = QLearningPlanner(grid, epsilon=0.1)
-    state = drone.position
+def plan_qlearning(grid, start, end, rng, store=None):
+    planner = QLearningPlanner(grid, alpha=PLANNER_PARAMS["alpha"], gamma=PLANNER_PARAMS["gamma"],
+                               epsilon=PLANNER_PARAMS["epsilon"], q_file=q_table_file(len(grid)),
+                               rng=rng, store=store)
+    state = start
     path = [state]
     visited_states = set()
 
@@ -41,50 +243,4 @@ def run_drone_simulation(start_coords, end_coords):
         path.append(state)
         if len(path) > 100:
             break
-
-    if path:
-        for step in path[1:]:
-            dx = abs(step[0] - drone.position[0])
-            dy = abs(step[1] - drone.position[1])
-            cost = 1.4 if dx == 1 and dy == 1 else 1
-            moved = drone.move(step, cost)
-            if random.random() < 0.2:
-                ox, oy = random.randint(0, 9), random.randint(0, 9)
-                if grid[ox][oy] == 0 and (ox, oy) not in drone.visited:
-                    grid[ox][oy] = 1
-            if not moved:
-                break
-
-        planner.save_q_table()
-
-    total_free_cells = grid.size - np.count_nonzero(grid)
-    coverage = len(drone.visited) / total_free_cells if total_free_cells > 0 else 0
-
-    # Save path plot
-    x, y = zip(*drone.path)
-    plt.imshow(grid, cmap='Greys')
-    plt.plot(y, x, marker='o', color='blue', linewidth=2)
-    plt.scatter(y[0], x[0], color='green', label='Start')
-    plt.scatter(y[-1], x[-1], color='red', label='End')
-    plt.title("🚁 Drone Path")
-    plt.legend()
-    plt.gca().invert_yaxis()
-    plt.savefig("static/path.png")
-    plt.close()
-
-    # Save heatmap
-    heatmap = np.zeros_like(grid, dtype=float)
-    for (x, y) in drone.visited:
-        heatmap[x][y] = 1
-    plt.imshow(heatmap, cmap='YlOrRd')
-    plt.title("🔥 Coverage Heatmap")
-    plt.colorbar(label='Visited Intensity')
-    plt.gca().invert_yaxis()
-    plt.savefig("static/heatmap.png")
-    plt.close()
-
-    return {
-        "energy": round(drone.energy, 2),
-        "coverage": round(coverage * 100, 2),
-        "goal_reached": end in drone.visited
-    }
+    return path
@@ -1,5 +1,9 @@
 import numpy as np
 
+# Obstacles of the sample map, laid out on a BASE_SIZE x BASE_SIZE grid
+BASE_SIZE = 10
+OBSTACLES = [(3, 4), (5, 5), (1, 2), (6, 7), (2, 6)]
+
 def create_grid(rows=10, cols=10):
     """
     Create a 2D grid with some obstacles.
@@ -9,12 +13,24 @@ def create_grid(rows=10, cols=10):
     grid = np.zeros((rows, cols), dtype=int)
 
     # Add some obstacles manually
-    obstacles = [(3, 4), (5, 5), (1, 2), (6, 7), (2, 6)]
-    for x, y in obstacles:
+    for x, y in OBSTACLES:
         grid[x][y] = 1
 
     return grid
 
+def create_scaled_grid(rows, cols):
+    """
+    The sample map at any resolution: each base cell becomes a block of
+    roughly (rows / BASE_SIZE) x (cols / BASE_SIZE) cells.
+    Equal to create_grid() at 10 x 10.
+    """
+    base = np.zeros((BASE_SIZE, BASE_SIZE), dtype=int)
+    for x, y in OBSTACLES:
+        base[x][y] = 1
+    row_idx = np.arange(rows) * BASE_SIZE // rows
+    col_idx = np.arange(cols) * BASE_SIZE // cols
+    return base[np.ix_(row_idx, col_idx)]
+
 def is_valid_cell(grid, x, y):
     """
     Check if a cell is within bounds and not an obstacle.
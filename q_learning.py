@@ -1,15 +1,144 @@
+import ast
+import atexit
 import random
 import json
 import os
+import threading
+
+FLUSH_INTERVAL = 30   # Seconds between background flushes of a dirty Q-table
+FLUSH_EVERY = 200     # Updates that trigger an early flush
+
+
+class QTableStore:
+    def __init__(self, q_file="q_table.json", flush_interval=FLUSH_INTERVAL, flush_every=FLUSH_EVERY):
+        """
+        Process-wide Q-table: loaded from disk once, updated in memory under
+        a lock, and written back by a background thread every
+        flush_interval seconds or after flush_every updates.
+        """
+        self.q_file = q_file
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.dirty = 0
+        self.version = 0   # Bumped on every update
+        self._snapshot = None
+        self.q_table = self._read()
+        self._wake = threading.Event()
+        threading.Thread(target=self._flusher, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _read(self):
+        if not os.path.exists(self.q_file):
+            return {}
+        with open(self.q_file, "r") as f:
+            raw = json.load(f)
+        return {
+            ast.literal_eval(k): {ast.literal_eval(a): v for a, v in actions.items()}
+            for k, actions in raw.items()
+        }
+
+    def best_action(self, state):
+        """
+        Highest-valued known action from state, or None if state is unseen.
+        """
+        with self.lock:
+            actions = self.q_table.get(state)
+            return max(actions, key=actions.get) if actions else None
+
+    def update(self, state, action, reward, next_state, alpha, gamma):
+        with self.lock:
+            self.q_table.setdefault(state, {})
+            self.q_table[state].setdefault(action, 0)
+            max_future_q = max(self.q_table.get(next_state, {}).values(), default=0)
+            self.q_table[state][action] += alpha * (reward + gamma * max_future_q - self.q_table[state][action])
+            self.dirty += 1
+            self.version += 1
+            if self.dirty >= self.flush_every:
+                self._wake.set()
+
+    def snapshot(self):
+        """
+        Read-only copy of the table as it is now, tagged with its version.
+        Reused until the next update, so taking one per request is cheap.
+        """
+        with self.lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                table = {state: dict(actions) for state, actions in self.q_table.items()}
+                self._snapshot = QTableSnapshot(table, self.version)
+            return self._snapshot
+
+    def flush(self):
+        """
+        Write the table to disk if it changed, replacing the file atomically.
+        """
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                serializable_q_table = {
+                    str(k): {str(a): v for a, v in actions.items()}
+                    for k, actions in self.q_table.items()
+                }
+                self.dirty = 0
+            tmp = f"{self.q_file}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(serializable_q_table, f)
+            os.replace(tmp, self.q_file)
+
+    def _flusher(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+class QTableSnapshot:
+    def __init__(self, q_table, version):
+        """
+        Frozen QTableStore.snapshot(): answers best_action() like the store
+        but ignores updates, so a planner on it never learns and, with a
+        seeded rng, always plans the same path.
+        """
+        self.q_table = q_table
+        self.version = version
+
+    def best_action(self, state):
+        actions = self.q_table.get(state)
+        return max(actions, key=actions.get) if actions else None
+
+    def update(self, state, action, reward, next_state, alpha, gamma):
+        pass
+
+    def flush(self):
+        pass
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def shared_store(q_file="q_table.json"):
+    """
+    The single QTableStore for q_file in this process.
+    """
+    path = os.path.abspath(q_file)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = QTableStore(path)  # Absolute: flushes land here even if the cwd changes
+        return _stores[path]
+
 
 class QLearningPlanner:
-    def __init__(self, grid, alpha=0.1, gamma=0.9, epsilon=0.2, q_file="q_table.json"):
+    def __init__(self, grid, alpha=0.1, gamma=0.9, epsilon=0.2, q_file="q_table.json", rng=None,
+                 store=None):
         self.grid = grid
-        self.q_table = {}
+        self.rng = rng or random  # Pass a seeded random.Random for repeatable runs
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.q_file = q_file
+        self.store = store or shared_store(q_file)
         self.load_q_table()
 
     def get_actions(self, state):
@@ -25,29 +154,20 @@ class QLearningPlanner:
         actions = self.get_actions(state)
         if not actions:
             return None
-        if random.random() < self.epsilon or state not in self.q_table:
-            return random.choice(actions)
-        return max(self.q_table[state], key=self.q_table[state].get)
+        if self.rng.random() < self.epsilon:
+            return self.rng.choice(actions)
+        best = self.store.best_action(state)
+        return best if best is not None else self.rng.choice(actions)
 
     def update(self, state, action, reward, next_state):
-        self.q_table.setdefault(state, {})
-        self.q_table[state].setdefault(action, 0)
-        max_future_q = max(self.q_table.get(next_state, {}).values(), default=0)
-        self.q_table[state][action] += self.alpha * (reward + self.gamma * max_future_q - self.q_table[state][action])
+        self.store.update(state, action, reward, next_state, self.alpha, self.gamma)
 
     def save_q_table(self):
-        serializable_q_table = {
-            str(k): {str(a): v for a, v in actions.items()}
-            for k, actions in self.q_table.items()
-        }
-        with open(self.q_file, "w") as f:
-            json.dump(serializable_q_table, f)
+        """
+        Flush the shared table now. Not needed per run: the store flushes
+        in the background.
+        """
+        self.store.flush()
 
     def load_q_table(self):
-        if os.path.exists(self.q_file):
-            with open(self.q_file, "r") as f:
-                raw = json.load(f)
-                self.q_table = {
-                    eval(k): {eval(a): v for a, v in actions.items()}
-                    for k, actions in raw.items()
-                }
+        self.q_table = self.store.q_table  # Shared, already loaded
@@ -0,0 +1,159 @@
+import argparse
+import os
+import random
+import numpy as np
+
+CELL_PX = 8        # Pixels per grid cell
+MARGIN_PX = 1      # Gap between cells
+MAX_FRAME_PX = 1024  # Cells shrink (down to 1 px, no margin) to keep frames this size
+REPLAY_FPS = 20
+
+# Cell states -> RGB, same colours as the pygame GUI
+FREE, OBSTACLE, VISITED, DRONE, MARGIN = range(5)
+PALETTE = np.array([
+    (255, 255, 255),  # Free
+    (0, 0, 0),        # Obstacle
+    (200, 200, 200),  # Visited
+    (0, 120, 255),    # Drone
+    (255, 255, 255),  # Margin between cells
+], dtype=np.uint8)
+
+def frame_geometry(rows, cols, cell=CELL_PX, margin=MARGIN_PX):
+    """
+    Cell size and margin that keep a frame within MAX_FRAME_PX.
+    """
+    while cell > 1 and max(rows, cols) * (cell + margin) + margin > MAX_FRAME_PX:
+        cell -= 1
+    if max(rows, cols) * (cell + margin) + margin > MAX_FRAME_PX:
+        margin = 0
+    return cell, margin
+
+def render_cells(states, cell=CELL_PX, margin=MARGIN_PX):
+    """
+    Palette-indexed frame (H, W) for a (rows, cols) array of cell states.
+    Every pixel looks up its cell through one fancy index, so there are no
+    per-cell draw calls. rgb() turns it into an (H, W, 3) image.
+    """
+    rows, cols = states.shape
+    padded = np.full((rows + 1, cols + 1), MARGIN, dtype=np.uint8)
+    padded[:rows, :cols] = states
+
+    def pixel_cells(n):
+        # Pixel -> cell index along one axis; margin pixels point at the pad
+        step = cell + margin
+        offset = np.arange(n * step + margin) - margin
+        index = offset // step
+        index[(offset < 0) | (offset % step >= cell)] = n
+        return index
+
+    return padded[np.ix_(pixel_cells(rows), pixel_cells(cols))]
+
+def rgb(frame):
+    return PALETTE[frame]
+
+class FrameRenderer:
+    def __init__(self, grid, cell=CELL_PX, margin=MARGIN_PX):
+        """
+        Keeps one indexed frame buffer for a grid and repaints single cells
+        in place, so a mission step costs two small slice assignments.
+        """
+        self.states = (np.asarray(grid) == 1).astype(np.uint8) * OBSTACLE
+        self.cell, self.margin = frame_geometry(*self.states.shape, cell, margin)
+        self.frame = render_cells(self.states, self.cell, self.margin)
+
+    def paint(self, row, col, state):
+        self.states[row, col] = state
+        y = row * (self.cell + self.margin) + self.margin
+        x = col * (self.cell + self.margin) + self.margin
+        self.frame[y:y + self.cell, x:x + self.cell] = state
+
+def mission_frames(grid, path, every=1):
+    """
+    Yield the indexed frame after every `every` steps of path (and the
+    last). Frames share one buffer; copy them if they are kept.
+    """
+    renderer = FrameRenderer(grid)
+    if not path:
+        return
+    renderer.paint(*path[0], DRONE)
+    yield renderer.frame
+    for i in range(1, len(path)):
+        if renderer.states[path[i - 1]] != OBSTACLE:
+            renderer.paint(*path[i - 1], VISITED)
+        renderer.paint(*path[i], DRONE)
+        if i % every == 0 or i == len(path) - 1:
+            yield renderer.frame
+
+def palette_image(frame):
+    from PIL import Image  # Deferred: only needed when writing replays
+    image = Image.fromarray(frame, mode="P")
+    image.putpalette(PALETTE.ravel().tolist())
+    return image
+
+def save_gif(frames, out_path, fps=REPLAY_FPS):
+    """
+    Stream indexed frames into an animated GIF. The palette is fixed, so
+    frames are written without colour quantisation. Returns the frame count.
+    """
+    images = (palette_image(frame) for frame in frames)
+    first = next(images, None)
+    if first is None:
+        return 0
+    count = [1]
+
+    def rest():
+        for image in images:
+            count[0] += 1
+            yield image
+
+    first.save(out_path, save_all=True, append_images=rest(),
+               duration=int(1000 / fps), loop=0, optimize=False)
+    return count[0]
+
+def save_png_sequence(frames, out_dir):
+    """
+    Write frames as out_dir/frame_00000.png, ... Returns the number written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for count, frame in enumerate(frames, start=1):
+        palette_image(frame).save(os.path.join(out_dir, f"frame_{count - 1:05d}.png"))
+    return count
+
+def main():
+    """
+    Batch replays: fly seeded missions between random cells and write one
+    GIF (or PNG sequence) per mission.
+    """
+    import time
+    from main import GRID_SIZE, DEFAULT_BOUNDS, load_map, fly
+
+    parser = argparse.ArgumentParser(description="Render mission replays headlessly")
+    parser.add_argument("--missions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--resolution", type=int, default=GRID_SIZE)
+    parser.add_argument("--every", type=int, default=1, help="keep one frame per N steps")
+    parser.add_argument("--format", choices=["gif", "png"], default="gif")
+    parser.add_argument("--out", default="replays")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    base_grid, _ = load_map(DEFAULT_BOUNDS, args.resolution)
+    free = np.argwhere(base_grid == 0)
+    rng = random.Random(args.seed)
+    for mission in range(args.missions):
+        start, end = (tuple(int(v) for v in free[rng.randrange(len(free))]) for _ in range(2))
+        grid = base_grid.copy()
+        drone = fly(grid, start, end, random.Random(rng.random()))
+
+        t0 = time.perf_counter()
+        frames = mission_frames(grid, drone.path, args.every)
+        name = os.path.join(args.out, f"mission_{mission:04d}")
+        if args.format == "gif":
+            count = save_gif(frames, name + ".gif")
+        else:
+            count = save_png_sequence(frames, name)
+        print(f"{name}: {count} frames in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
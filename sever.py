@@ -1,15 +1,157 @@
-from flask import Flask, request, jsonify
-from main import run_drone_simulation  # wrap your logic in a function
+import json
+import numbers
+from flask import Flask, Response, request, jsonify, stream_with_context, url_for
+from main import run_cell_simulation, coords_to_cell, check_area, aggregate_heatmap, RESULT_CACHE, DEFAULT_BOUNDS, GRID_SIZE  # wrap your logic in a function
+from jobs import JobQueue, QueueFull, MAX_QUEUED
+
+MAX_BATCH = MAX_QUEUED  # Start/end pairs accepted per batch request (a batch must fit in the queue)
 
 app = Flask(__name__)
+jobs = JobQueue(run_cell_simulation)
 
 @app.route('/simulate', methods=['POST'])
 def simulate():
-    data = request.json
-    start = data['start']
-    end = data['end']
-    result = run_drone_simulation(start, end)
-    return jsonify(result)
+    data = request.get_json(silent=True)
+    try:
+        start, end = mission_points(data)
+        resolution, bounds = map_area(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    seed = data.get('seed')  # Optional: deterministic, cacheable run
+    try:
+        job_id = jobs.submit(coords_to_cell(start, bounds, resolution), coords_to_cell(end, bounds, resolution),
+                             seed, resolution, bounds)
+    except QueueFull as e:
+        return queue_full(e)
+    status_url = url_for('simulation_status', job_id=job_id)
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": status_url}), 202, {"Location": status_url}
+
+@app.route('/simulate/batch', methods=['POST'])
+def simulate_batch():
+    """
+    Body: {"pairs": [{"start": [lat, lon], "end": [lat, lon]}, ...],
+           "seed", "resolution", "bounds": optional, "stream": optional bool}
+
+    Pairs landing on the same grid cells are simulated once, as jobs on the
+    shared queue: the whole batch is queued or, if it doesn't fit, refused
+    with 429. Returns 202 with {"jobs": [job id per pair, in request
+    order], "status_urls": [...]} to poll, or with "stream": true an NDJSON
+    line per unique cell pair as soon as it finishes.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get('pairs'):
+        return jsonify({"error": "no pairs given"}), 400
+    pairs = data['pairs']
+    if not isinstance(pairs, list):
+        return jsonify({"error": "pairs must be a list"}), 400
+    if len(pairs) > MAX_BATCH:
+        return jsonify({"error": f"at most {MAX_BATCH} pairs per batch"}), 413
+    seed = data.get('seed')
+    try:
+        points = [mission_points(pair, f"pairs[{i}]") for i, pair in enumerate(pairs)]
+        resolution, bounds = map_area(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cell_pairs = [(coords_to_cell(start, bounds, resolution), coords_to_cell(end, bounds, resolution))
+                  for start, end in points]
+    unique = list(dict.fromkeys(cell_pairs))
+    try:
+        job_ids = jobs.submit_many([(start, end, seed, resolution, bounds) for start, end in unique])
+    except QueueFull as e:
+        return queue_full(e)
+    job_of = dict(zip(unique, job_ids))
+
+    if data.get('stream'):
+        cells_of = dict(zip(job_ids, unique))
+        indices = {}  # unique cell pair -> request positions
+        for i, cells in enumerate(cell_pairs):
+            indices.setdefault(cells, []).append(i)
+
+        def lines():
+            for job in jobs.as_completed(job_ids):
+                start, end = cells_of[job["id"]]
+                yield json.dumps({
+                    "indices": indices[(start, end)],
+                    "start_cell": start,
+                    "end_cell": end,
+                    "result": job["result"] if job["status"] == "done" else {"error": job["error"]},
+                }) + "\n"
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+    ordered = [job_of[cells] for cells in cell_pairs]
+    return jsonify({
+        "jobs": ordered,
+        "status_urls": [url_for('simulation_status', job_id=job_id) for job_id in ordered],
+        "unique_pairs": len(unique),
+    }), 202
+
+def mission_points(data, where="body"):
+    """
+    ([lat, lon], [lat, lon]) from the "start" and "end" of a request body or
+    batch pair. Raises ValueError naming `where` when either is malformed.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{where} must be an object with start and end")
+    points = []
+    for name in ("start", "end"):
+        point = data.get(name)
+        if (not isinstance(point, (list, tuple)) or len(point) != 2
+                or not all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in point)):
+            raise ValueError(f"{where}.{name} must be [lat, lon] numbers")
+        points.append(tuple(point))
+    return points[0], points[1]
+
+def queue_full(error):
+    return jsonify({"error": str(error)}), 429, {"Retry-After": "5"}
+
+def map_area(data):
+    """
+    Optional "resolution" (cells per side) and "bounds" ([lat_min, lat_max,
+    lon_min, lon_max]) of a request body. Raises ValueError when invalid.
+    """
+    try:
+        resolution = int(data.get('resolution', GRID_SIZE))
+        bounds = tuple(float(v) for v in data.get('bounds', DEFAULT_BOUNDS))
+    except (TypeError, ValueError):
+        raise ValueError("resolution must be an integer and bounds [lat_min, lat_max, lon_min, lon_max]")
+    if len(bounds) != 4:
+        raise ValueError("bounds must be [lat_min, lat_max, lon_min, lon_max]")
+    check_area(bounds, resolution)
+    return resolution, bounds
+
+@app.route('/simulate/<job_id>', methods=['GET'])
+def simulation_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job id"}), 404
+    return jsonify(job)
+
+@app.route('/heatmap', methods=['GET'])
+def heatmap():
+    """
+    Visit density summed over every mission flown on a map so far.
+    Query: resolution, bounds=lat_min,lat_max,lon_min,lon_max (optional).
+    """
+    area = {}
+    if 'resolution' in request.args:
+        area['resolution'] = request.args['resolution']
+    if 'bounds' in request.args:
+        area['bounds'] = request.args['bounds'].split(',')
+    try:
+        resolution, bounds = map_area(area)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    image, missions, max_visits = aggregate_heatmap(bounds, resolution)
+    return jsonify({
+        "missions": missions,
+        "max_visits": max_visits,
+        "image": url_for('static', filename=image),
+    })
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(RESULT_CACHE.metrics())
 
 if __name__ == '__main__':
     app.run(debug=True)
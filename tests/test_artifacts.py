@@ -0,0 +1,47 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import artifacts
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", str(tmp_path / "sim"))
+    monkeypatch.setattr(artifacts, "_last_cleanup", time.time())   # No sweep unless a test asks
+    return tmp_path / "sim"
+
+
+def test_identical_images_share_one_file(artifact_dir):
+    first = artifacts.save_png(b"png-a")
+    assert first == artifacts.save_png(b"png-a")
+    assert first != artifacts.save_png(b"png-b")
+    assert (artifact_dir / os.path.basename(first)).read_bytes() == b"png-a"
+    assert sorted(os.listdir(artifact_dir)) == sorted(
+        os.path.basename(p) for p in (first, artifacts.save_png(b"png-b")))   # No .tmp left
+
+
+def test_cleanup_removes_only_stale_images(artifact_dir):
+    stale = artifact_dir / os.path.basename(artifacts.save_png(b"old"))
+    fresh = artifact_dir / os.path.basename(artifacts.save_png(b"new"))
+    hour_ago = time.time() - 3600
+    os.utime(stale, (hour_ago, hour_ago))
+    assert artifacts.cleanup(max_age=60) == 1
+    assert not stale.exists() and fresh.exists()
+
+
+def test_reuse_keeps_an_image_alive(artifact_dir):
+    path = artifact_dir / os.path.basename(artifacts.save_png(b"img"))
+    hour_ago = time.time() - 3600
+    os.utime(path, (hour_ago, hour_ago))
+    artifacts.save_png(b"img")
+    assert artifacts.cleanup(max_age=60) == 0
+
+
+def test_rendered_path_is_a_png():
+    pytest.importorskip("matplotlib")
+    from main import render_path
+    data = render_path(np.zeros((5, 5)), [(0, 0), (1, 1), (2, 1)])
+    assert data.startswith(b"\x89PNG")
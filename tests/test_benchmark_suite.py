@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE = os.path.join(ROOT, "benchmarks", "suite.py")
+SMALL = ["--sizes", "20", "--densities", "0.2", "--repeat", "1", "--maps", "random", "city"]
+
+
+def run_suite(*args):
+    return subprocess.run([sys.executable, SUITE, *SMALL, *args], capture_output=True, text=True, cwd=ROOT)
+
+
+def test_suite_records_every_case_and_compares_runs(tmp_path):
+    out = tmp_path / "bench.json"
+    cases = ["astar", "dstar", "dstar_notify", "root_astar_array", "smooth"]
+    assert run_suite("--only", *cases, "--out", str(out)).returncode == 0
+    results = json.loads(out.read_text())["results"]
+    assert sorted({(r["case"], r["map"]) for r in results}) == sorted(
+        (case, style) for case in cases for style in ("random", "city"))
+    assert all(r["seconds"] > 0 and r["heap_pops"] > 0 for r in results if r["case"] != "smooth")
+
+    again = run_suite("--only", *cases, "--compare", str(out), "--tolerance", "1000")
+    assert again.returncode == 0 and json.loads(again.stdout)["regressions"] == []
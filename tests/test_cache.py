@@ -0,0 +1,37 @@
+import time
+
+from cache import ResultCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.metrics()["expired"] == 1 and cache.metrics()["size"] == 0
+
+
+def test_metrics_count_hits_misses_and_invalidations():
+    cache = ResultCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["invalidated"]) == (1, 1, 1)
+    assert metrics["hit_rate"] == 0.5 and metrics["size"] == 0
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from drone import Drone
+from garuda_shared import CellPath, CellSet
+
+
+def test_drone_uses_the_shared_containers():
+    drone = Drone(start=(0, 0), energy=10, shape=(5, 5))
+    assert type(drone.path) is CellPath and type(drone.visited) is CellSet
+
+
+def test_moves_record_path_visits_and_energy():
+    drone = Drone(start=(0, 0), energy=3, shape=(5, 5))
+    assert drone.move((0, 1)) and drone.move((1, 2), cost=1.4)
+    assert drone.move((0, 1), cost=0.5)
+    assert not drone.move((0, 2))                     # 0.1 left: not enough energy
+    assert drone.position == (0, 1) and drone.energy == pytest.approx(0.1)
+    assert list(drone.path) == [(0, 0), (0, 1), (1, 2), (0, 1)]
+    assert len(drone.visited) == 3
+    assert np.asarray(drone.path).shape == (4, 2)
+
+
+def test_off_grid_move_raises_and_leaves_the_drone_untouched():
+    drone = Drone(start=(0, 0), energy=10, shape=(3, 3))
+    with pytest.raises(IndexError):
+        drone.move((3, 0))
+    assert drone.position == (0, 0) and drone.energy == 10 and len(drone.path) == 1
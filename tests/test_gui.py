@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from drone import Drone
+from gui import CELL_SIZE, MARGIN, GridView
+from map import create_grid
+
+PATH = [(0, 0), (0, 1), (1, 1), (1, 2), (2, 2), (2, 3)]
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    grid = create_grid()
+    side = len(grid) * (CELL_SIZE + MARGIN) + MARGIN
+    yield grid, pygame.display.set_mode((side, side))
+    pygame.display.quit()
+
+
+def test_incremental_frames_match_a_full_redraw(screen):
+    grid, surface = screen
+    drone = Drone(start=PATH[0], energy=50, shape=grid.shape)
+    view = GridView(surface, grid)
+    view.redraw(drone)
+    for step in PATH[1:]:
+        drone.move(step, 1)
+        view.move_drone(drone)
+        assert len(view.dirty) == 2   # Old drone cell and new one only
+        view.present()
+        assert view.dirty == []
+    incremental = pygame.image.tostring(surface, "RGB")
+
+    GridView(surface, grid).redraw(drone)
+    assert pygame.image.tostring(surface, "RGB") == incremental
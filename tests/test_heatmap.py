@@ -0,0 +1,48 @@
+import threading
+
+import numpy as np
+
+import main
+from heatmap import VisitHeatmap, visit_counts
+
+
+def test_counts_match_a_loop():
+    path = [(0, 0), (0, 1), (0, 0), (2, 3), (0, 0)]
+    expected = np.zeros((3, 4), dtype=np.uint32)
+    for r, c in path:
+        expected[r, c] += 1
+    assert np.array_equal(visit_counts(path, (3, 4)), expected)
+    assert not visit_counts([], (3, 4)).any()
+
+
+def test_heatmap_sums_missions_from_many_threads():
+    heatmap = VisitHeatmap((5, 5))
+    path = [(1, 1), (1, 2), (2, 2)]
+    threads = [threading.Thread(target=lambda: [heatmap.add(path) for _ in range(50)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counts, missions = heatmap.snapshot()
+    assert missions == 200
+    assert np.array_equal(counts, visit_counts(path, (5, 5)) * 200)
+
+
+def test_heatmap_save_and_load(tmp_path):
+    heatmap = VisitHeatmap((4, 4))
+    heatmap.add([(0, 0), (3, 3)])
+    heatmap.save(str(tmp_path / "h.npz"))
+    loaded = VisitHeatmap.load(str(tmp_path / "h.npz"))
+    assert loaded.missions == 1
+    assert np.array_equal(loaded.counts, heatmap.counts)
+
+
+def test_every_mission_on_a_map_is_aggregated(monkeypatch):
+    monkeypatch.setattr(main, "save_png", lambda data: data)
+    main.reload_maps()
+    for seed in (1, 2):
+        main.run_drone_simulation((28.89, 76.81), (28.41, 77.39), seed=seed, resolution=40)
+    _, missions, max_visits = main.aggregate_heatmap(resolution=40)
+    assert missions == 2 and max_visits >= 2   # Both missions start on the same cell
+    main.reload_maps()
+    assert main.aggregate_heatmap(resolution=40)[1] == 0
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("pygame", "matplotlib")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ["main", "sever"])
+def test_server_import_path_skips_gui_and_plotting(module):
+    if module == "sever":
+        pytest.importorskip("flask")
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=ROOT)
+    assert out.stdout.strip() == ""
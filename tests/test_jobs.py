@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from jobs import JobQueue, QueueFull
+
+
+def blocked_queue(max_queued):
+    """A one-worker queue whose jobs wait for the returned event"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def work(value):
+        started.set()
+        release.wait(5)
+        if value < 0:
+            raise ValueError("negative")
+        return value * 2
+
+    queue = JobQueue(work, workers=1, max_queued=max_queued)
+    queue.submit(0)         # Occupies the worker
+    assert started.wait(5)
+    return queue, release
+
+
+def test_submit_many_is_all_or_nothing():
+    queue, release = blocked_queue(max_queued=3)
+    queue.submit(1)
+    with pytest.raises(QueueFull):
+        queue.submit_many([(2,), (3,), (4,)])
+    assert queue.pending.qsize() == 1 and len(queue.jobs) == 2   # Nothing of the batch kept
+    assert len(queue.submit_many([(2,), (3,)])) == 2
+    with pytest.raises(QueueFull):
+        queue.submit(5)
+    release.set()
+
+
+def test_as_completed_yields_every_job_with_its_outcome():
+    queue, release = blocked_queue(max_queued=4)
+    job_ids = queue.submit_many([(1,), (-1,), (3,)])
+    release.set()
+    jobs = {job["id"]: job for job in queue.as_completed(job_ids)}
+    assert set(jobs) == set(job_ids)
+    assert [jobs[job_id]["status"] for job_id in job_ids] == ["done", "failed", "done"]
+    assert jobs[job_ids[0]]["result"] == 2 and jobs[job_ids[1]]["error"] == "negative"
+
+
+def test_as_completed_skips_unknown_ids():
+    queue = JobQueue(lambda: None, workers=1)
+    assert list(queue.as_completed(["nope"])) == []
+
+
+def test_job_goes_from_queued_to_done():
+    queue, release = blocked_queue(max_queued=2)
+    job_id = queue.submit(21)
+    assert queue.get(job_id)["status"] == "queued"
+    release.set()
+    job = next(queue.as_completed([job_id]))
+    assert job["status"] == "done" and job["result"] == 42
+    assert job["finished_at"] >= job["submitted_at"]
+    assert queue.get("nope") is None
+
+
+def test_full_queue_raises():
+    queue, release = blocked_queue(max_queued=1)
+    queue.submit(1)
+    with pytest.raises(QueueFull):
+        queue.submit(2)
+    release.set()
+
+
+def test_finished_jobs_are_pruned_after_their_ttl():
+    queue = JobQueue(lambda value: value, workers=1, result_ttl=0)
+    old = queue.submit(1)
+    list(queue.as_completed([old]))
+    queue.jobs[old]["finished_at"] -= 1   # Finished a second ago, past a TTL of 0
+    new = queue.submit(2)
+    assert queue.get(old) is None
+    assert queue.get(new) is not None
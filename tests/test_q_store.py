@@ -0,0 +1,40 @@
+import json
+import time
+
+from q_learning import QLearningPlanner, QTableStore, shared_store
+
+GRID = [[0, 0], [0, 0]]
+
+
+def test_planners_share_one_store_per_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = shared_store("q.json")
+    assert shared_store(str(tmp_path / "q.json")) is store
+    a = QLearningPlanner(GRID, q_file="q.json")
+    b = QLearningPlanner(GRID, q_file="q.json")
+    a.update((0, 0), (0, 1), 1.0, (0, 1))
+    assert a.q_table is b.q_table is store.q_table
+    assert b.store.best_action((0, 0)) == (0, 1)
+
+
+def test_flush_round_trips_and_skips_clean_tables(tmp_path):
+    path = tmp_path / "q.json"
+    store = QTableStore(str(path), flush_interval=3600)
+    store.flush()
+    assert not path.exists()   # Nothing to write yet
+    store.update((0, 0), (1, 0), 2.0, (1, 0), alpha=0.5, gamma=0.9)
+    store.flush()
+    assert json.loads(path.read_text()) == {"(0, 0)": {"(1, 0)": 1.0}}
+    assert QTableStore(str(path), flush_interval=3600).q_table == {(0, 0): {(1, 0): 1.0}}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_enough_updates_trigger_a_background_flush(tmp_path):
+    path = tmp_path / "q.json"
+    store = QTableStore(str(path), flush_interval=3600, flush_every=3)
+    for step in range(3):
+        store.update((0, step), (0, 1), 1.0, (0, step + 1), alpha=0.1, gamma=0.9)
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert path.exists() and store.dirty == 0
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import replay
+from map import create_grid
+from replay import (DRONE, MAX_FRAME_PX, OBSTACLE, VISITED, FrameRenderer, frame_geometry,
+                    mission_frames, render_cells)
+
+PATH = [(0, 0), (0, 1), (1, 1), (1, 2), (2, 2), (2, 3), (3, 3)]
+
+
+def test_cells_and_margins_land_on_the_right_pixels():
+    frame = render_cells(np.array([[OBSTACLE, DRONE]], dtype=np.uint8), cell=3, margin=1)
+    assert frame.shape == (5, 9)
+    assert (frame[1:4, 1:4] == OBSTACLE).all() and (frame[1:4, 5:8] == DRONE).all()
+    assert (frame[0] == replay.MARGIN).all() and (frame[:, 4] == replay.MARGIN).all()
+
+
+@pytest.mark.parametrize("size", [10, 300, 2000])
+def test_frames_stay_within_the_size_cap(size):
+    cell, margin = frame_geometry(size, size)
+    assert cell >= 1
+    assert size * (cell + margin) + margin <= MAX_FRAME_PX or (cell, margin) == (1, 0)
+
+
+def test_painted_frame_matches_a_fresh_render():
+    renderer = FrameRenderer(create_grid())
+    renderer.paint(0, 0, VISITED)
+    renderer.paint(4, 5, DRONE)
+    assert np.array_equal(renderer.frame, render_cells(renderer.states, renderer.cell, renderer.margin))
+
+
+def test_mission_frames_follow_the_path():
+    frames = [frame.copy() for frame in mission_frames(create_grid(), PATH, every=4)]
+    assert len(frames) == 3   # Start, step 4 and the last step
+    states = FrameRenderer(create_grid()).states
+    for cell in PATH[:-1]:
+        states[cell] = VISITED
+    states[PATH[-1]] = DRONE
+    assert np.array_equal(frames[-1], render_cells(states))
+    assert list(mission_frames(create_grid(), [])) == []
+
+
+def test_gif_and_png_exports_write_every_frame(tmp_path):
+    pytest.importorskip("PIL")
+    count = replay.save_gif(mission_frames(create_grid(), PATH), str(tmp_path / "m.gif"))
+    assert count == len(PATH) and (tmp_path / "m.gif").stat().st_size > 0
+    assert replay.save_png_sequence(mission_frames(create_grid(), PATH), str(tmp_path / "png")) == len(PATH)
+    assert len(list((tmp_path / "png").iterdir())) == len(PATH)
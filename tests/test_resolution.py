@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import main
+from map import create_grid, create_scaled_grid
+
+BOUNDS = main.DEFAULT_BOUNDS
+
+
+def test_corners_map_to_corner_cells_and_outside_points_clamp():
+    lat_min, lat_max, lon_min, lon_max = BOUNDS
+    assert main.coords_to_cell((lat_max, lon_min), BOUNDS, 50) == (0, 0)
+    assert main.coords_to_cell((lat_min, lon_max), BOUNDS, 50) == (49, 49)
+    assert main.coords_to_cell((lat_max + 1, lon_min - 1), BOUNDS, 50) == (0, 0)
+    assert main.coords_to_cell((lat_min - 1, lon_max + 1), BOUNDS, 50) == (49, 49)
+
+
+@pytest.mark.parametrize("bounds, resolution", [
+    ((28.9, 28.4, 76.8, 77.4), 10),   # lat_min > lat_max
+    ((28.4, 28.9, 77.4, 77.4), 10),   # Empty longitude span
+    (BOUNDS, 1),
+    (BOUNDS, main.MAX_GRID_SIZE + 1),
+])
+def test_invalid_areas_are_rejected(bounds, resolution):
+    with pytest.raises(ValueError):
+        main.check_area(bounds, resolution)
+
+
+def test_scaled_map_keeps_the_sample_layout():
+    assert np.array_equal(create_scaled_grid(10, 10), create_grid())
+    big = create_scaled_grid(40, 40)
+    assert big.shape == (40, 40)
+    assert np.array_equal(big[::4, ::4], create_grid())
+
+
+def test_large_grids_fly_with_astar(monkeypatch):
+    monkeypatch.setattr(main, "save_png", lambda data: data)
+    result = main.run_drone_simulation((28.89, 76.81), (28.41, 77.39), seed=1, resolution=40)
+    assert result["planner"] == "astar"
+    assert main.planner_backend(main.QLEARNING_MAX_SIZE) == "qlearning"
@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pytest
+
+import main
+from q_learning import shared_store
+
+REPO = os.path.join(os.path.dirname(__file__), "..")
+START, END = (2, 3), (8, 1)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """The Q-table store for a copy of the shipped q_table.json; PNGs kept in memory"""
+    shutil.copy(os.path.join(REPO, "q_table.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "save_png", lambda data: data)
+    main.RESULT_CACHE.clear()
+    yield shared_store("q_table.json")
+    main.RESULT_CACHE.clear()
+
+
+def test_same_seed_flies_the_same_path(store):
+    first = main.run_cell_simulation(START, END, seed=3)
+    for _ in range(7):
+        main.RESULT_CACHE.clear()   # Fly it again rather than replay the cached result
+        again = main.run_cell_simulation(START, END, seed=3)
+        assert again["path_image"] == first["path_image"]
+        assert again["energy"] == first["energy"]
+
+
+def test_seeded_runs_do_not_train_the_shared_table(store):
+    version = store.version
+    main.run_cell_simulation(START, END, seed=3)
+    assert store.version == version
+    main.run_cell_simulation(START, END)
+    assert store.version > version
+
+
+def test_cached_result_is_dropped_once_the_table_learns(store):
+    hits = main.RESULT_CACHE.stats["hits"]
+    main.run_cell_simulation(START, END, seed=3)
+    main.run_cell_simulation(START, END, seed=3)
+    assert main.RESULT_CACHE.stats["hits"] == hits + 1
+    main.run_cell_simulation(START, END)   # Unseeded: updates the Q-table
+    main.run_cell_simulation(START, END, seed=3)
+    assert main.RESULT_CACHE.stats["hits"] == hits + 1
@@ -0,0 +1,83 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+
+import sever
+from jobs import JobQueue
+
+PAIR = {"start": [28.6, 77.0], "end": [28.5, 77.2]}
+
+
+@pytest.fixture
+def client():
+    return sever.app.test_client()
+
+
+@pytest.fixture
+def fake_jobs(monkeypatch):
+    """Replace the simulation with an instant one that echoes its cells"""
+    queue = JobQueue(lambda start, end, seed, resolution, bounds: {"start": start, "end": end})
+    monkeypatch.setattr(sever, "jobs", queue)
+    return queue
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"pairs": [PAIR, {"start": [28.6, 77.0]}]}, "pairs[1].end"),
+    ({"pairs": [PAIR, {"start": "28.6,77.0", "end": [1, 2]}]}, "pairs[1].start"),
+    ({"pairs": [PAIR, {"start": [28.6, None], "end": [1, 2]}]}, "pairs[1].start"),
+    ({"pairs": [PAIR, [1, 2]]}, "pairs[1] must be an object"),
+    ({"pairs": {"start": [1, 2]}}, "pairs must be a list"),
+    ({"pairs": [PAIR], "resolution": [10]}, "resolution"),
+])
+def test_malformed_batches_are_rejected_up_front(client, fake_jobs, body, message):
+    response = client.post("/simulate/batch", json=body)
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+    assert not fake_jobs.jobs   # Nothing was queued
+
+
+def test_batch_is_queued_with_one_job_per_unique_cell_pair(client, fake_jobs):
+    response = client.post("/simulate/batch", json={"pairs": [PAIR, PAIR, {**PAIR, "end": PAIR["start"]}]})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["unique_pairs"] == 2 and len(body["jobs"]) == 3
+    assert body["jobs"][0] == body["jobs"][1] != body["jobs"][2]
+    done = {job["id"]: job for job in fake_jobs.as_completed(body["jobs"])}
+    assert done[body["jobs"][0]]["status"] == "done"
+
+
+def test_streamed_batch_reports_each_unique_pair(client, fake_jobs):
+    response = client.post("/simulate/batch", json={"pairs": [PAIR, PAIR], "stream": True})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 1 and lines[0]["indices"] == [0, 1]
+    assert lines[0]["result"]["start"] == lines[0]["start_cell"]
+
+
+def test_saturated_queue_answers_429(client, monkeypatch):
+    release = threading.Event()
+    queue = JobQueue(lambda *args: release.wait(5), workers=1, max_queued=2)
+    monkeypatch.setattr(sever, "jobs", queue)
+    try:
+        response = client.post("/simulate/batch", json={"pairs": [PAIR, {**PAIR, "end": PAIR["start"]},
+                                                                  {**PAIR, "start": [28.8, 76.9]}]})
+        assert response.status_code == 429 and response.headers["Retry-After"]
+        assert not queue.jobs
+        assert client.post("/simulate", json=PAIR).status_code == 202
+    finally:
+        release.set()
+
+
+def test_single_simulation_is_queued_and_polled(client, fake_jobs):
+    response = client.post("/simulate", json=PAIR)
+    assert response.status_code == 202
+    body = response.get_json()
+    assert response.headers["Location"].endswith(body["status_url"])
+    list(fake_jobs.as_completed([body["job_id"]]))
+    job = client.get(body["status_url"]).get_json()
+    assert job["status"] == "done" and job["result"]["start"] == list(sever.coords_to_cell(
+        tuple(PAIR["start"]), sever.DEFAULT_BOUNDS, sever.GRID_SIZE))
+    assert client.get("/simulate/unknown").status_code == 404
+    assert client.post("/simulate", json={"start": [1, 2]}).status_code == 400
@@ -0,0 +1,33 @@
+import numpy as np
+
+from astar_module import astar_array, line_of_sight, path_cost, segment_clear, smooth_path
+
+
+def test_uses_the_shared_clearance_rule():
+    grid = np.zeros((3, 3), dtype=int)
+    grid[0, 1] = grid[1, 0] = 1
+    # astar_array cuts this corner; a smoothed segment may not
+    assert not segment_clear(grid, (0, 0), [(1, 1)])[0]
+    rng = np.random.default_rng(0)
+    grid = (rng.random((20, 20)) < 0.3).astype(int)
+    ends = rng.integers(0, 20, size=(50, 2))
+    assert np.array_equal(segment_clear(grid, (5, 5), ends),
+                          line_of_sight.segment_clear(grid == 0, (5, 5), ends))
+
+
+def test_smoothing_never_costs_more_and_stays_clear():
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        grid = (rng.random((30, 30)) < 0.2).astype(int)
+        grid[0, 0] = grid[-1, -1] = 0
+        path = astar_array(grid, (0, 0), (29, 29))
+        if not path:
+            continue
+        waypoints, before, after = smooth_path(grid, path)
+        assert waypoints[0] == path[0] and waypoints[-1] == path[-1]
+        assert before == path_cost(path) and after == path_cost(waypoints)
+        assert after <= before + 1e-9
+        for a, b in zip(waypoints, waypoints[1:]):
+            # Either a shortcut in sight or a straight run of the original path
+            run = np.diff(path[path.index(a):path.index(b) + 1], axis=0)
+            assert segment_clear(grid, a, [b])[0] or (run == run[0]).all()